@@ -2,17 +2,33 @@ import numpy as np
 from pathlib import Path
 from tqdm import tqdm
 from environments import spe_ed
+from environments.archive import GameArchive, is_archive
 from environments.spe_ed import SavedGame
-from statistics import get_log_files
+from statistics import get_log_files, log_name
 from state_representation import windowed_abstraction
 
 
+def load_games(log_dir, prefix=""):
+    """Iterate over `(name, game)` of all games in a directory of log files or a game archive.
+
+    Args:
+        prefix: Only load games whose name starts with this, see `statistics.get_log_files`
+    """
+    if is_archive(log_dir):
+        archive = GameArchive(log_dir)
+        for name in archive.names:
+            if name.startswith(prefix):
+                yield name, archive.load(name)
+    else:
+        for log_file in get_log_files(log_dir, prefix=prefix):
+            yield log_name(log_file), SavedGame.load(log_file)
+
+
 def create_sequences(log_dir, date, radius=5):
     "Create a state/action sequences .npz file."
     names = []
     data = {"names": names}
-    for log_file in tqdm(get_log_files(log_dir, prefix=date)):
-        game = SavedGame.load(log_file)
+    for game_name, game in tqdm(load_games(log_dir, prefix=date)):
         for player_id in game.player_ids:
             # Compute abstraction window
             windows = windowed_abstraction(game, player_id, radius=radius)
@@ -27,7 +43,7 @@ def create_sequences(log_dir, date, radius=5):
             if any(a is None for a in actions):
                 continue  # Skip sequences with illegal actions
 
-            name = f"{log_file.name[:-5]}_{player_id}"
+            name = f"{game_name}_{player_id}"
             names.append(name)
             data[f"{name}-state"] = windows
             data[f"{name}-action"] = actions
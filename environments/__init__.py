@@ -2,8 +2,14 @@ from environments.spe_ed import Player
 from environments.websocketenv import WebsocketEnv
 from environments.simulator import SimulatedSpe_edEnv, Spe_edSimulator
 from environments.spe_ed_env import Spe_edEnv
+from environments.boards import Bitboard, OverlayBoard, PaddedBoard
+from environments.batch_simulator import BatchSimulator
 
 __all__ = [
+    "BatchSimulator",
+    "Bitboard",
+    "OverlayBoard",
+    "PaddedBoard",
     "Player",
     "Spe_edEnv",
     "SimulatedSpe_edEnv",
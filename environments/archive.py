@@ -0,0 +1,129 @@
+import json
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from environments import compact_log
+from environments.compact_log import CompactGame
+from environments.spe_ed import SavedGame, compressed_suffix, read_log
+
+# File suffix of game archives
+suffix = ".spe_ed_archive"
+
+# Header: magic, version, length of the UTF-8 encoded JSON index
+archive_header = struct.Struct("<4sBQ")
+magic = b"SPEA"
+version = 1
+
+
+def is_archive(path):
+    """Check whether `path` is a game archive file."""
+    return str(path).endswith(suffix) and Path(path).is_file()
+
+
+class GameArchive:
+    """Many games in one file, with an index of their metadata.
+
+    The file consists of a header, a JSON index and the games in the format of `environments.compact_log`. It is
+    memory-mapped, so only the pages of games and rounds, which are actually read, are loaded from disk.
+
+    Each entry of `index` contains the `name` of the game, its `date` if the name is a date, `width`, `height`,
+    `rounds`, the player `names`, the `winner` and `you` as player ids, and `offset` and `size` of the game data.
+    """
+    def __init__(self, archive_file):
+        """Open a game archive.
+
+        Args:
+            archive_file: Path to an archive created by `write_archive`
+        """
+        self.archive_file = Path(archive_file)
+        self._data = np.memmap(self.archive_file, dtype=np.uint8, mode='r')
+
+        file_magic, file_version, index_size = archive_header.unpack_from(self._data)
+        if file_magic != magic or file_version != version:
+            raise ValueError(f"Not a game archive of a supported version: {archive_file}")
+        index_end = archive_header.size + index_size
+        self.index = json.loads(bytes(self._data[archive_header.size:index_end]).decode("utf-8"))
+        self._data_start = index_end
+        self._entries = {entry["name"]: entry for entry in self.index}
+
+    def __len__(self):
+        """Number of games in the archive."""
+        return len(self.index)
+
+    @property
+    def names(self):
+        """Names of all games in the archive."""
+        return [entry["name"] for entry in self.index]
+
+    def read_compact(self, name):
+        """Read the `CompactGame` with the given name, its arrays are views of the memory-mapped file."""
+        entry = self._entries[name]
+        start = self._data_start + entry["offset"]
+        return CompactGame.from_bytes(self._data[start:start + entry["size"]])
+
+    def load(self, name):
+        """Load the game with the given name as `SavedGame`."""
+        return SavedGame.from_compact(self.read_compact(name))
+
+
+def _index_entry(name, game):
+    """Metadata of a `CompactGame` stored in the archive index."""
+    try:
+        date = datetime.strptime(name, "%Y%m%d-%H%M%S").isoformat()
+    except ValueError:
+        date = None
+    saved_game = SavedGame.from_compact(game)
+    winner = saved_game.winner
+    return {
+        "name": name,
+        "date": date,
+        "width": game.width,
+        "height": game.height,
+        "rounds": saved_game.rounds,
+        "names": game.names,
+        "winner": winner.player_id if winner is not None else None,
+        "you": game.you,
+    }
+
+
+def write_archive(archive_file, log_files):
+    """Pack plain or compressed JSON or compact logs into one game archive.
+
+    Games are named after their log files without suffix. Incomplete games are not added.
+
+    Returns:
+        List of log files, which could not be added
+    """
+    index = []
+    games = []
+    failed = []
+    offset = 0
+    for log_file in map(Path, log_files):
+        try:
+            if log_file.name.endswith(compact_log.suffix):
+                name = log_file.name[:-len(compact_log.suffix)]
+                game = compact_log.read_compact(log_file)
+            else:
+                name = log_file.name[:-len(compressed_suffix if log_file.name.endswith(compressed_suffix) else ".json")]
+                game = CompactGame.from_states(read_log(log_file))
+        except (ValueError, KeyError, TypeError, IndexError, OSError, EOFError, struct.error, zlib.error):
+            failed.append(log_file)  # Corrupt, truncated or malformed log
+            continue
+        if game.running:
+            failed.append(log_file)
+            continue
+
+        data = game.to_bytes()
+        index.append(dict(_index_entry(name, game), offset=offset, size=len(data)))
+        games.append(data)
+        offset += len(data)
+
+    encoded_index = json.dumps(index, separators=(',', ':')).encode("utf-8")
+    with open(archive_file, "wb") as f:
+        f.write(archive_header.pack(magic, version, len(encoded_index)))
+        f.write(encoded_index)
+        for data in games:
+            f.write(data)
+    return failed
@@ -0,0 +1,222 @@
+import numpy as np
+from environments.spe_ed import Player, directions
+from environments.kernel import batch_kernel, kernel_enabled
+
+# Movement per direction index, see `environments.spe_ed.directions`
+direction_dx = np.array([d.cartesian[0] for d in directions])
+direction_dy = np.array([d.cartesian[1] for d in directions])
+# Change of direction index and speed of each action, see `environments.spe_ed.actions`
+action_changes = ((3, 0), (1, 0), (0, -1), (0, 1), (0, 0))
+
+
+def warm_up():
+    """Verify and compile the kernel used by `BatchSimulator.step` ahead of time.
+
+    Otherwise, this happens on the first step and takes about a second, which should not count against a deadline.
+    """
+    if kernel_enabled():
+        batch = BatchSimulator(
+            np.zeros((1, 2, 2), dtype=np.int8), np.ones((1, 1), dtype=np.int8), np.zeros((1, 1), dtype=np.int64),
+            np.zeros((1, 1), dtype=np.int64), np.zeros((1, 1), dtype=np.int64), np.ones((1, 1), dtype=np.int64),
+            np.ones((1, 1), dtype=bool), np.ones(1, dtype=np.int64)
+        )
+        batch.step(np.zeros((1, 1), dtype=np.int64))
+
+
+class BatchSimulator:
+    """Lockstep simulation of many independent games of the same board size.
+
+    All games are stored as stacked arrays and advanced by one round at once, with loops over players and move steps
+    only, not over games. Results are identical to calling `simulate` for every game separately.
+
+    Attributes:
+        cells: (N, H, W) int8 cell states
+        player_ids, x, y, direction, speed: (N, P) int players states, `direction` is an index into `directions`
+        active: (N, P) bool
+        rounds: (N, ) int
+    """
+    def __init__(self, cells, player_ids, x, y, direction, speed, active, rounds):
+        """Initialize BatchSimulator from stacked arrays, see attributes."""
+        self.cells = cells
+        self.player_ids = player_ids
+        self.x = x
+        self.y = y
+        self.direction = direction
+        self.speed = speed
+        self.active = active
+        self.rounds = rounds
+
+    @classmethod
+    def from_simulators(cls, sims):
+        """Stack the states of `Spe_edSimulator`s with equal board sizes and numbers of players."""
+        def player_attribute(attr, dtype):
+            return np.array([[getattr(p, attr) for p in sim.players] for sim in sims], dtype=dtype)
+
+        return cls(
+            cells=np.stack([np.asarray(sim.cells) for sim in sims]).astype(np.int8),
+            player_ids=player_attribute('player_id', np.int8),
+            x=player_attribute('x', np.int64),
+            y=player_attribute('y', np.int64),
+            direction=np.array([[p.direction_index for p in sim.players] for sim in sims], dtype=np.int64),
+            speed=player_attribute('speed', np.int64),
+            active=player_attribute('active', bool),
+            rounds=np.array([sim.rounds for sim in sims], dtype=np.int64),
+        )
+
+    @property
+    def n_games(self):
+        """Number of games N."""
+        return self.cells.shape[0]
+
+    @property
+    def n_players(self):
+        """Number of players P in each game."""
+        return self.player_ids.shape[1]
+
+    def players(self, n):
+        """Get the players of game `n` as `Player` objects."""
+        return [
+            Player(
+                int(self.player_ids[n, p]), int(self.x[n, p]), int(self.y[n, p]), int(self.direction[n, p]),
+                int(self.speed[n, p]), bool(self.active[n, p])
+            ) for p in range(self.n_players)
+        ]
+
+    def to_simulator(self, n):
+        """Get game `n` as `Spe_edSimulator`."""
+        from environments.simulator import Spe_edSimulator
+
+        return Spe_edSimulator(self.cells[n].copy(), self.players(n), int(self.rounds[n]))
+
+    def copy(self):
+        """Create a copy of this batch."""
+        return BatchSimulator(
+            self.cells.copy(), self.player_ids.copy(), self.x.copy(), self.y.copy(), self.direction.copy(),
+            self.speed.copy(), self.active.copy(), self.rounds.copy()
+        )
+
+    def legal_actions(self):
+        """Check which actions the first player of each game survives, without performing any of them.
+
+        Moves of other players are not considered, so this is exact for single player games only.
+
+        Returns:
+            legal: (N, 5) bool array, aligned with `environments.spe_ed.actions`
+        """
+        n_games, height, width = self.cells.shape
+        games = np.arange(n_games)
+        jump = self.rounds % 6 == 0
+        legal = np.zeros((n_games, len(action_changes)), dtype=bool)
+        for a, (turn, acceleration) in enumerate(action_changes):
+            direction = (self.direction[:, 0] + turn) % 4
+            speed = self.speed[:, 0] + acceleration
+            alive = self.active[:, 0] & (speed >= 1) & (speed <= 10)
+            dx, dy = direction_dx[direction], direction_dy[direction]
+            x, y = self.x[:, 0].copy(), self.y[:, 0].copy()
+            for i in range(10):
+                step = alive & (i < speed)
+                if not step.any():
+                    break
+                x += dx
+                y += dy
+
+                # Leaving the bounds
+                inside = (x >= 0) & (y >= 0) & (x < width) & (y < height)
+                alive &= ~step | inside
+                step &= inside
+
+                # Check for jumps
+                if i > 0:
+                    step &= ~(jump & (i < speed - 1))
+
+                g = games[step]
+                alive[g[self.cells[g, y[g], x[g]] != 0]] = False  # Collisions
+            legal[:, a] = alive
+        return legal
+
+    def step(self, actions, mask=None):
+        """Perform one round in all games in place.
+
+        Args:
+            actions: (N, P) int array of indices into `environments.spe_ed.actions`. Other values are invalid actions.
+            mask: Optional (N, ) bool array, only games where `mask` is set are advanced.
+
+        Returns:
+            newly_occupied: (N, H, W) bool array of cells occupied in this round
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        n_games, height, width = self.cells.shape
+        games = np.arange(n_games)
+        if mask is None:
+            mask = np.ones(n_games, dtype=bool)
+
+        if kernel_enabled():  # Use compiled loop over games instead of vectorized steps
+            newly_occupied = np.zeros(self.cells.shape, dtype=bool)
+            batch_kernel(
+                self.cells, self.player_ids, self.x, self.y, self.direction, self.speed, self.active, self.rounds,
+                actions, np.asarray(mask, dtype=bool), newly_occupied
+            )
+            return newly_occupied
+
+        # Perform actions
+        acting = self.active & mask[:, None]
+        self.direction[acting & (actions == 0)] += 3  # turn_left
+        self.direction[acting & (actions == 1)] += 1  # turn_right
+        self.direction %= 4
+        self.speed[acting & (actions == 2)] -= 1  # slow_down
+        self.speed[acting & (actions == 3)] += 1  # speed_up
+        invalid = (actions < 0) | (actions > 4) | (self.speed < 1) | (self.speed > 10)
+        self.active[acting & invalid] = False
+
+        # Move players
+        jump = self.rounds % 6 == 0
+        new_owner = np.zeros_like(self.cells)  # Player index + 1 of the player occupying a cell in this round
+        for p in range(self.n_players):
+            moving = self.active[:, p] & mask
+            started = moving.copy()  # All players, which start to move
+            speed = self.speed[:, p]
+            dx = direction_dx[self.direction[:, p]]
+            dy = direction_dy[self.direction[:, p]]
+            x = self.x[:, p].copy()
+            y = self.y[:, p].copy()
+            for i in range(10):
+                step = moving & (i < speed)
+                if not step.any():
+                    break
+                x[step] += dx[step]
+                y[step] += dy[step]
+
+                # Players leaving the bounds stop at the first position outside the bounds
+                out_of_bounds = step & ((x < 0) | (y < 0) | (x >= width) | (y >= height))
+                self.active[out_of_bounds, p] = False
+                moving &= ~out_of_bounds
+                step &= ~out_of_bounds
+
+                # Check for jumps
+                if i > 0:
+                    step &= ~(jump & (i < speed - 1))
+
+                g = games[step]
+                gx, gy = x[g], y[g]
+                collision = self.cells[g, gy, gx] != 0
+
+                # Collisions
+                cg, cx, cy = g[collision], gx[collision], gy[collision]
+                self.active[cg, p] = False
+                self.cells[cg, cy, cx] = -1
+                owner = new_owner[cg, cy, cx]
+                newly = owner > 0  # Occupancy is from this round, other player loses, too
+                self.active[cg[newly], owner[newly] - 1] = False
+
+                # No collisions
+                fg, fx, fy = g[~collision], gx[~collision], gy[~collision]
+                self.cells[fg, fy, fx] = self.player_ids[fg, p]
+                new_owner[fg, fy, fx] = p + 1
+
+            self.x[started, p] = x[started]
+            self.y[started, p] = y[started]
+
+        # Round completed
+        self.rounds[mask] += 1
+
+        return new_owner != 0
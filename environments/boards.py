@@ -0,0 +1,242 @@
+import numpy as np
+from environments.moves import max_speed
+
+
+class Bitboard(np.lib.mixins.NDArrayOperatorsMixin):
+    """Occupancy of a board packed into a single integer.
+
+    Bit `y * width + x` is set iff cell `(x, y)` is occupied. Player ids are not stored, occupied cells read as `1`.
+
+    Supports the subset of the ndarray interface used by `simulate`, i.e. `shape`, `copy()` and reading/writing single
+    cells via `board[y, x]`, so it can be used as drop-in replacement for `cells` in `Spe_edSimulator`.
+    Copying a board only copies a reference to the (immutable) integer.
+    All other numpy operations work on a dense bool representation, which is created lazily on demand.
+    """
+    def __init__(self, bits, width, height):
+        """Initialize Bitboard.
+
+        Args:
+            bits: Integer containing the occupancy bits
+            width: Width of the board
+            height: Height of the board
+        """
+        self._bits = bits
+        self.width = width
+        self.height = height
+        self._dense = None  # Cached dense representation
+
+    @classmethod
+    def from_cells(cls, cells):
+        """Create bitboard from a cells array, where all non-zero cells are considered occupied."""
+        height, width = cells.shape
+        packed = np.packbits(np.asarray(cells).ravel() != 0, bitorder='little')
+        return cls(int.from_bytes(packed.tobytes(), 'little'), width, height)
+
+    @property
+    def bits(self):
+        """Integer containing the occupancy bits."""
+        return self._bits
+
+    @bits.setter
+    def bits(self, bits):
+        """Replace the occupancy bits."""
+        self._bits = bits
+        self._dense = None  # Invalidate cached dense representation
+
+    @property
+    def shape(self):
+        """Shape of the board as (height, width)."""
+        return (self.height, self.width)
+
+    def copy(self):
+        """Create a copy of this board."""
+        return Bitboard(self.bits, self.width, self.height)
+
+    def is_free(self, position):
+        """Check if target location is not occupied."""
+        x, y = position
+        # Check if index is inside bounds
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return not self.bits >> int(y * self.width + x) & 1
+        return False
+
+    def __getitem__(self, key):
+        """Read a single cell as `0` or `1` by `board[y, x]`, or anything else from the dense representation."""
+        if isinstance(key, tuple) and len(key) == 2 and all(isinstance(i, (int, np.integer)) for i in key):
+            y, x = key
+            return self.bits >> int(y * self.width + x) & 1
+        return self.__array__()[key]
+
+    def __setitem__(self, key, value):
+        """Write a single cell by `board[y, x] = value`, any non-zero value marks it as occupied."""
+        y, x = key
+        if value != 0:
+            self.bits |= 1 << int(y * self.width + x)
+        else:
+            self.bits &= ~(1 << int(y * self.width + x))
+
+    def __array__(self, dtype=None, copy=None):
+        """Return numpy compatible representation."""
+        if self._dense is None:
+            n_bytes = (self.width * self.height + 7) // 8
+            packed = np.frombuffer(self.bits.to_bytes(n_bytes, 'little'), dtype=np.uint8)
+            dense = np.unpackbits(packed, count=self.width * self.height, bitorder='little')
+            self._dense = dense.reshape(self.height, self.width).astype(bool)
+            self._dense.setflags(write=False)  # Writes have to go through __setitem__
+        if dtype is not None:
+            return self._dense.astype(dtype)
+        return self._dense
+
+    def __repr__(self):
+        """Get readable representation."""
+        return f"Bitboard({self.width}x{self.height}, occupied={bin(self.bits).count('1')})"
+
+
+class OverlayBoard(np.lib.mixins.NDArrayOperatorsMixin):
+    """Sparse copy-on-write board on top of a shared root array.
+
+    Only cells written to this board (or the boards it was copied from) are stored, all other cells are read from
+    `root`, which is never modified. Thus, a copy costs only the number of cells changed since the root instead of
+    the whole board, which is useful for keeping many states of a search tree alive.
+
+    Supports the same subset of the ndarray interface as `Bitboard`. Other numpy operations work on a dense array,
+    which is created on demand and not kept, see `to_cells`.
+    """
+    def __init__(self, root, changes=None):
+        """Initialize OverlayBoard.
+
+        Args:
+            root: Shared cells array, not modified
+            changes: Dict of flat cell index to value, overriding `root`
+        """
+        self.root = root
+        self.changes = {} if changes is None else changes
+
+    @property
+    def shape(self):
+        """Shape of the board as (height, width)."""
+        return self.root.shape
+
+    @property
+    def width(self):
+        """Width of the board."""
+        return self.root.shape[1]
+
+    @property
+    def height(self):
+        """Height of the board."""
+        return self.root.shape[0]
+
+    def copy(self):
+        """Create a copy of this board, sharing the same root."""
+        return OverlayBoard(self.root, dict(self.changes))
+
+    def is_free(self, position):
+        """Check if target location is not occupied."""
+        x, y = position
+        # Check if index is inside bounds
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self[y, x] == 0
+        return False
+
+    def __getitem__(self, key):
+        """Read a single cell by `board[y, x]`, or anything else from a dense copy."""
+        if isinstance(key, tuple) and len(key) == 2 and all(isinstance(i, (int, np.integer)) for i in key):
+            y, x = key
+            value = self.changes.get(y * self.width + x)
+            return self.root[y, x] if value is None else value
+        return self.__array__()[key]
+
+    def __setitem__(self, key, value):
+        """Write a single cell by `board[y, x] = value`, without modifying the root."""
+        y, x = key
+        self.changes[y * self.width + x] = value
+
+    def to_cells(self):
+        """Create a dense copy of the board as `Cells`."""
+        from environments.spe_ed import Cells
+
+        return Cells(self.__array__())
+
+    def __array__(self, dtype=None, copy=None):
+        """Return numpy compatible representation."""
+        dense = np.array(self.root, dtype=dtype, copy=True)
+        if len(self.changes) > 0:
+            dense.flat[np.fromiter(self.changes.keys(), dtype=np.int64, count=len(self.changes))] = \
+                list(self.changes.values())
+        return dense
+
+    def __repr__(self):
+        """Get readable representation."""
+        return f"OverlayBoard({self.width}x{self.height}, changes={len(self.changes)})"
+
+
+class PaddedBoard(np.lib.mixins.NDArrayOperatorsMixin):
+    """Board surrounded by a permanently occupied border.
+
+    The border is `padding` cells wide, by default the maximum speed. Thus, all cells within one move of a position on
+    the board can be indexed in `padded` without checking the bounds, leaving the board shows up as hitting the
+    border. `is_free` relies on this and must only be called for positions at most `padding` cells outside the board.
+
+    Reading and writing cells via `board[y, x]` and all numpy operations use `interior`, a view of the unpadded
+    cells, so heuristics still see the real board shape.
+    """
+    border = -2  # Value of border cells
+
+    def __init__(self, padded, padding=max_speed):
+        """Initialize PaddedBoard.
+
+        Args:
+            padded: Cells array including the border
+            padding: Width of the border
+        """
+        self.padded = padded
+        self.padding = padding
+        self.interior = padded[padding:-padding, padding:-padding]
+
+    @classmethod
+    def from_cells(cls, cells, padding=max_speed):
+        """Create padded board from a cells array."""
+        return cls(np.pad(np.asarray(cells), padding, constant_values=cls.border), padding)
+
+    @property
+    def shape(self):
+        """Shape of the board without border as (height, width)."""
+        return self.interior.shape
+
+    @property
+    def width(self):
+        """Width of the board without border."""
+        return self.interior.shape[1]
+
+    @property
+    def height(self):
+        """Height of the board without border."""
+        return self.interior.shape[0]
+
+    def copy(self):
+        """Create a copy of this board."""
+        return PaddedBoard(self.padded.copy(), self.padding)
+
+    def is_free(self, position):
+        """Check if target location is not occupied, without bounds checks."""
+        x, y = position
+        return self.padded[y + self.padding, x + self.padding] == 0
+
+    def __getitem__(self, key):
+        """Read cells of the board without border."""
+        return self.interior[key]
+
+    def __setitem__(self, key, value):
+        """Write cells of the board without border."""
+        self.interior[key] = value
+
+    def __array__(self, dtype=None, copy=None):
+        """Return numpy compatible representation."""
+        if dtype is not None:
+            return self.interior.astype(dtype)
+        return self.interior
+
+    def __repr__(self):
+        """Get readable representation."""
+        return f"PaddedBoard({self.width}x{self.height}, padding={self.padding})"
@@ -0,0 +1,189 @@
+import logging
+from pathlib import Path
+import numpy as np
+from environments.moves import direction_deltas
+
+try:
+    from numba import njit
+except ImportError:  # JIT is optional
+    njit = None
+
+# Movement per direction index, as arrays for the compiled kernel
+kernel_dx = np.array([dx for dx, _ in direction_deltas], dtype=np.int64)
+kernel_dy = np.array([dy for _, dy in direction_deltas], dtype=np.int64)
+
+# Recorded games used to verify the compiled kernel
+check_log_dir = Path(__file__).parent.parent / "tests" / "logs"
+
+
+def _jit(func):
+    """Compile `func` if numba is available, otherwise keep the Python function."""
+    return njit(cache=True, nogil=True)(func) if njit is not None else func
+
+
+@_jit
+def simulate_kernel(cells, player_ids, x, y, direction, speed, active, rounds, actions, newly_occupied):
+    """Perform one game step of Spe_ed on plain arrays.
+
+    Same logic as `environments.simulator.simulate`, but written in the subset of Python that can be compiled.
+    All arguments except `rounds` and `actions` are modified in place.
+
+    Args:
+        cells: (H, W) int array of cell states
+        player_ids, x, y, direction, speed: (P, ) int player states, `direction` is an index into `directions`
+        active: (P, ) bool
+        rounds: Number of the round
+        actions: (P, ) int array of indices into `environments.spe_ed.actions`, other values are invalid actions
+        newly_occupied: (P * 10, 3) int buffer, which is filled with x, y and player index of newly occupied cells
+
+    Returns:
+        Number of newly occupied cells
+    """
+    height, width = cells.shape
+    jump = rounds % 6 == 0
+    n_players = player_ids.shape[0]
+
+    # Perform actions
+    for p in range(n_players):
+        if not active[p]:
+            continue
+        action = actions[p]
+        if action == 0:  # turn_left
+            direction[p] = (direction[p] + 3) % 4
+        elif action == 1:  # turn_right
+            direction[p] = (direction[p] + 1) % 4
+        elif action == 2:  # slow_down
+            speed[p] -= 1
+            if speed[p] < 1:
+                active[p] = False
+        elif action == 3:  # speed_up
+            speed[p] += 1
+            if speed[p] > 10:
+                active[p] = False
+        elif action != 4:  # Invalid
+            active[p] = False
+
+    # Move players
+    n = 0
+    for p in range(n_players):
+        if not active[p]:
+            continue
+        px, py = x[p], y[p]
+        dx, dy = kernel_dx[direction[p]], kernel_dy[direction[p]]
+        for i in range(speed[p]):
+            px += dx
+            py += dy
+            if px < 0 or py < 0 or py >= height or px >= width:
+                active[p] = False  # Player left bounds
+                break
+
+            if jump and 0 < i < speed[p] - 1:  # Check for jumps
+                continue
+
+            if cells[py, px] != 0:
+                # Collision
+                active[p] = False
+                cells[py, px] = -1
+                for k in range(n):
+                    if newly_occupied[k, 0] == px and newly_occupied[k, 1] == py:  # Occupancy is from this round
+                        active[newly_occupied[k, 2]] = False  # Other player loses, too
+            else:
+                # No collision
+                cells[py, px] = player_ids[p]
+                newly_occupied[n, 0] = px
+                newly_occupied[n, 1] = py
+                newly_occupied[n, 2] = p
+                n += 1
+        x[p] = px
+        y[p] = py
+
+    return n
+
+
+@_jit
+def batch_kernel(cells, player_ids, x, y, direction, speed, active, rounds, actions, mask, newly_occupied):
+    """Perform one game step in every game of a batch, see `BatchSimulator.step`.
+
+    Arrays are those of `simulate_kernel`, stacked along a first axis of games. `rounds` is incremented in place and
+    `newly_occupied` is an (N, H, W) bool array, where cells occupied in this round are set.
+    """
+    buffer = np.empty((player_ids.shape[1] * 10, 3), dtype=np.int64)
+    for g in range(cells.shape[0]):
+        if not mask[g]:
+            continue
+        n = simulate_kernel(
+            cells[g], player_ids[g], x[g], y[g], direction[g], speed[g], active[g], rounds[g], actions[g], buffer
+        )
+        for k in range(n):
+            newly_occupied[g, buffer[k, 1], buffer[k, 0]] = True
+        rounds[g] += 1
+
+
+def run_kernel(kernel, cells, players, rounds, actions):
+    """Run `simulate_kernel` on `cells` and `Player` objects, with the same interface as `simulate`."""
+    from environments.spe_ed import actions as action_names
+
+    def attribute(attr, dtype=np.int64):
+        return np.array([getattr(p, attr) for p in players], dtype=dtype)
+
+    x, y, speed, active = attribute('x'), attribute('y'), attribute('speed'), attribute('active', bool)
+    direction = np.array([p.direction_index for p in players], dtype=np.int64)
+    action_indices = np.full(len(players), 4, dtype=np.int64)
+    for p, action in enumerate(actions[:len(players)]):
+        action_indices[p] = action_names.index(action) if action in action_names else -1
+    buffer = np.empty((len(players) * 10, 3), dtype=np.int64)
+
+    n = kernel(
+        np.asarray(cells), attribute('player_id'), x, y, direction, speed, active, rounds, action_indices, buffer
+    )
+
+    for p, px, py, d, s, a in zip(players, x.tolist(), y.tolist(), direction.tolist(), speed.tolist(), active.tolist()):
+        p.x, p.y, p.direction_index, p.speed, p.active = px, py, d, s, a
+    return cells, players, rounds + 1, [(px, py) for px, py, _ in buffer[:n].tolist()]
+
+
+def check_kernel(kernel, log_files):
+    """Verify that `kernel` agrees with `simulate` on all states of recorded games."""
+    from environments.simulator import simulate
+    from environments.spe_ed import SavedGame
+
+    for log_file in log_files:
+        game = SavedGame.load(log_file)
+        for t in range(game.rounds):
+            actions = game.infer_actions(t)
+            expected = simulate(game.cell_states[t].copy(), [p.copy() for p in game.player_states[t]], t + 1, actions)
+            result = run_kernel(
+                kernel, game.cell_states[t].copy(), [p.copy() for p in game.player_states[t]], t + 1, actions
+            )
+            if not (
+                np.array_equal(result[0], expected[0]) and result[1] == expected[1] and result[2] == expected[2] and
+                set(result[3]) == set(expected[3])
+            ):
+                return False
+    return True
+
+
+_kernel_enabled = None
+
+
+def kernel_enabled():
+    """Check whether the compiled kernels are available and verified.
+
+    The check runs once, on first call, and compares the compiled kernel with `simulate` on the recorded games in
+    `tests/logs`. Without these, the compiled kernels are not enabled.
+    """
+    global _kernel_enabled
+    if _kernel_enabled is None:
+        _kernel_enabled = False
+        if njit is None:
+            logging.debug("No JIT available, using pure Python simulation")
+            return False
+
+        log_files = sorted(check_log_dir.glob("*.json"))
+        try:
+            _kernel_enabled = len(log_files) > 0 and check_kernel(simulate_kernel, log_files)
+        except Exception:
+            logging.exception("Compiled simulation kernel failed")
+        if not _kernel_enabled:
+            logging.warning("Compiled simulation kernel could not be verified, using pure Python simulation")
+    return _kernel_enabled
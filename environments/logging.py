@@ -1,17 +1,55 @@
 from datetime import datetime
+import gzip
 import json
 import logging
 from pathlib import Path
 import owncloud
 import pandas as pd
+from environments import compact_log
+from environments.spe_ed import compressed_suffix
+
+
+def write_log(log_dir, name, states, compact=False, compression_level=6):
+    """Write the states of a game to a log file.
+
+    Args:
+        log_dir: Directory of the log file
+        name: Name of the log file without suffix
+        states: List of game states in form of parsed json.
+        compact: Write the compact format of `environments.compact_log` instead of JSON
+        compression_level: gzip compression level of JSON logs, `None` writes uncompressed JSON
+
+    Returns:
+        Path of the log file
+    """
+    if compact:
+        log_file = Path(log_dir) / (name + compact_log.suffix)
+        compact_log.write_compact(log_file, states)
+    elif compression_level is not None:
+        log_file = Path(log_dir) / (name + compressed_suffix)
+        with gzip.open(log_file, "wt", compresslevel=compression_level) as f:
+            json.dump(states, f, separators=(',', ':'))
+    else:
+        log_file = Path(log_dir) / (name + ".json")
+        with open(log_file, "w") as f:
+            json.dump(states, f, separators=(',', ':'))
+    return log_file
 
 
 class Spe_edLogger():
-    def __init__(self, log_dir="logs/", callbacks=[]):
+    def __init__(self, log_dir="logs/", callbacks=[], compact=False, compression_level=6):
+        """Initialize Spe_edLogger.
+
+        Args:
+            compact: Write logs in the compact format of `environments.compact_log` instead of JSON
+            compression_level: gzip compression level of JSON logs, `None` writes uncompressed JSON
+        """
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
         self.callbacks = callbacks
+        self.compact = compact
+        self.compression_level = compression_level
 
     def log(self, states, time_limits):
         """Handle the logging of a completed game.
@@ -19,12 +57,11 @@ class Spe_edLogger():
         Args:
             states: List of game states in form of parsed json.
         """
-        log_file = self.log_dir / f"{datetime.now():%Y%m%d-%H%M%S}.json"
-        with open(log_file, "w") as f:
-            json.dump(states, f, separators=(',', ':'))
+        name = f"{datetime.now():%Y%m%d-%H%M%S}"
+        log_file = write_log(self.log_dir, name, states, self.compact, self.compression_level)
 
         if len(time_limits) > 0:
-            time_file = log_file.parent / (log_file.name[:-5] + ".csv")
+            time_file = self.log_dir / (name + ".csv")
             pd.DataFrame({"time_limit": time_limits}).to_csv(time_file, index=False)
 
         # Handle callbacks
@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+max_speed = 10
+
+# Unit steps for each direction index, in the same order as `environments.spe_ed.directions`
+direction_deltas = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+Move = namedtuple("Move", ["written", "skipped", "end", "written_before"])
+Move.__doc__ = """Relative cells of a single move of a player.
+
+Attributes:
+    written: Tuple of `(i, dx, dy)` for every cell the player occupies, `i` is the index of the step
+    skipped: Tuple of `(i, dx, dy)` for every cell the player jumps over
+    end: `(dx, dy)` of the position after the move
+    written_before: `written_before[k]` is the number of written cells with `i < k`
+"""
+
+
+def _create_move(direction, speed, jump):
+    dx, dy = direction_deltas[direction]
+    written, skipped = [], []
+    for i in range(speed):
+        cell = (i, (i + 1) * dx, (i + 1) * dy)
+        if jump and 0 < i < speed - 1:
+            skipped.append(cell)
+        else:
+            written.append(cell)
+    written_before = tuple(sum(1 for c in written if c[0] < k) for k in range(speed + 1))
+    return Move(tuple(written), tuple(skipped), (speed * dx, speed * dy), written_before)
+
+
+# Move table, indexed as `moves[direction][speed][jump]`, where speed is in range [1, max_speed]
+moves = tuple(
+    (None, ) + tuple(tuple(_create_move(d, s, jump) for jump in (False, True)) for s in range(1, max_speed + 1))
+    for d in range(len(direction_deltas))
+)
+
+
+def steps_inside(direction, x, y, width, height):
+    """Number of steps from `(x, y)` into `direction` that stay inside the bounds.
+
+    A move with `speed <= steps_inside(...)` never leaves the bounds.
+    """
+    if direction == 0:
+        return width - 1 - x
+    if direction == 1:
+        return height - 1 - y
+    if direction == 2:
+        return x
+    return y
+
+
+def clip_move(direction, speed, jump, x, y, width, height):
+    """Relative cells of a move from `(x, y)`, clipped to the bounds.
+
+    Returns:
+        written: Tuple of `(i, dx, dy)` for every cell inside the bounds, which the player occupies
+        end: `(dx, dy)` of the position after the move. If the player leaves the bounds, this is the first position
+            outside the bounds instead.
+        leaves: Whether the player leaves the bounds
+    """
+    move = moves[direction][speed][jump]
+    inside = steps_inside(direction, x, y, width, height)
+    if speed <= inside:
+        return move.written, move.end, False
+    dx, dy = direction_deltas[direction]
+    return move.written[:move.written_before[inside]], ((inside + 1) * dx, (inside + 1) * dy), True
+
+
+def max_distance(speed, n_rounds):
+    """Maximum number of cells a player with `speed` can travel within the next `n_rounds` rounds."""
+    return sum(min(speed + t, max_speed) for t in range(1, n_rounds + 1))
@@ -0,0 +1,82 @@
+import struct
+import numpy as np
+from environments.boards import Bitboard
+from environments.simulator import Spe_edSimulator
+from environments.spe_ed import Player
+
+# Header: width, height, rounds, number of players
+state_header = struct.Struct("<HHIB")
+# Player: player_id, x, y, direction index, speed, active
+player_entry = struct.Struct("<bhhBBB")
+# Batch header: number of states, followed by the end offset of each state
+batch_header = struct.Struct("<I")
+
+
+def state_to_bytes(sim):
+    """Serialize a `Spe_edSimulator` into a compact byte string.
+
+    The format consists of a header, a table of fixed-width players and the occupancy packed into bits, in the same
+    order as `Bitboard`. Player ids of cells, player names, `parent` and `changed` are not stored.
+    An 80x80 state with 6 players takes 857 bytes.
+    """
+    height, width = sim.cells.shape
+    if isinstance(sim.cells, Bitboard):
+        occupancy = sim.cells.bits.to_bytes((width * height + 7) // 8, 'little')
+    else:
+        occupancy = np.packbits(np.asarray(sim.cells).ravel() != 0, bitorder='little').tobytes()
+    return b"".join(
+        [
+            state_header.pack(width, height, sim.rounds, len(sim.players)),
+            *(
+                player_entry.pack(p.player_id, p.x, p.y, p.direction_index, p.speed, p.active)
+                for p in sim.players
+            ),
+            occupancy,
+        ]
+    )
+
+
+def state_from_bytes(data, bitboard=False):
+    """Deserialize a state created by `state_to_bytes`.
+
+    Args:
+        data: Bytes-like object
+        bitboard: Whether to create a `Bitboard` instead of a dense bool array as cells
+
+    Returns:
+        sim: `Spe_edSimulator` without parent
+    """
+    data = memoryview(data)
+    width, height, rounds, n_players = state_header.unpack_from(data)
+    players = []
+    offset = state_header.size
+    for _ in range(n_players):
+        player_id, x, y, direction, speed, active = player_entry.unpack_from(data, offset)
+        players.append(Player(player_id, x, y, direction, speed, bool(active)))
+        offset += player_entry.size
+
+    occupancy = data[offset:offset + (width * height + 7) // 8]
+    if bitboard:
+        cells = Bitboard(int.from_bytes(occupancy, 'little'), width, height)
+    else:
+        cells = np.unpackbits(np.frombuffer(occupancy, dtype=np.uint8), count=width * height, bitorder='little')
+        cells = cells.astype(bool).reshape(height, width)
+    return Spe_edSimulator(cells, players, rounds)
+
+
+def pack_states(sims):
+    """Serialize many states into one contiguous buffer."""
+    states = [state_to_bytes(sim) for sim in sims]
+    ends = np.cumsum([len(s) for s in states]).astype("<u4")
+    return b"".join([batch_header.pack(len(states)), ends.tobytes(), *states])
+
+
+def unpack_states(data, bitboard=False):
+    """Deserialize all states of a buffer created by `pack_states`."""
+    data = memoryview(data)
+    n_states, = batch_header.unpack_from(data)
+    base = batch_header.size + 4 * n_states
+    ends = np.frombuffer(data[batch_header.size:base], dtype="<u4").tolist()
+    return [
+        state_from_bytes(data[base + start:base + end], bitboard) for start, end in zip([0] + ends[:-1], ends)
+    ]
@@ -1,13 +1,53 @@
+import itertools
 import time
 import numpy as np
+from environments import spe_ed
 from environments.spe_ed import Player, directions
 from environments.spe_ed_env import Spe_edEnv
+from environments.boards import Bitboard, PaddedBoard
+from environments.moves import clip_move, direction_deltas, steps_inside, max_speed, max_distance
+from environments.zobrist import zobrist_keys
 
 
-def simulate(cells, players, rounds, actions):
-    """Perfroma one game step of Spe_ed."""
+def simulate(cells, players, rounds, actions, changes=None):
+    """Perfroma one game step of Spe_ed.
+
+    `cells` may either be an ndarray, a `Bitboard` or a `PaddedBoard`, which is updated in place.
+
+    Args:
+        changes: Optional list, to which `(y, x, previous_value)` is appended for every written cell of a dense board.
+    """
+    if isinstance(cells, Bitboard):
+        return _simulate_bitboard(cells, players, rounds, actions)
+    if isinstance(cells, PaddedBoard):
+        return _simulate_padded(cells, players, rounds, actions, changes)
+
     height, width = cells.shape
 
+    def occupy(x, y, player_id):
+        value = cells[y, x]
+        if changes is not None:
+            changes.append((y, x, value))
+        cells[y, x] = player_id if value == 0 else -1  # Collisions are marked with -1
+        return value != 0
+
+    rounds, newly_occupied = _move_players(players, rounds, actions, width, height, occupy)
+    return cells, players, rounds, newly_occupied
+
+
+def _move_players(players, rounds, actions, width, height, occupy):
+    """Perform the actions and move all players, independent of the board representation.
+
+    Args:
+        occupy: Function `occupy(x, y, player_id)`, which writes a single cell inside the bounds and returns whether
+            it was occupied before
+
+    Returns:
+        rounds: Number of the next round
+        newly_occupied: Cells `(x, y)` occupied in this round
+    """
+    jump = bool(rounds % 6 == 0)
+
     # Perform actions
     for player, action in zip(players, actions):
         player.perform(action)
@@ -17,36 +57,74 @@ def simulate(cells, players, rounds, actions):
     for player in players:
         if not player.active:
             continue
-        pos = player.position
-        for i in range(player.speed):
-            pos += player.direction.cartesian
-            if pos[0] < 0 or pos[1] < 0 or pos[1] >= height or pos[0] >= width:
-                # Player left bounds
-                player.active = False
-                break  # Position after leaving the bouds is not actual position, just the first outside the bounds
+        x, y = int(player.x), int(player.y)
+        written, (end_x, end_y), leaves = clip_move(player.direction_index, player.speed, jump, x, y, width, height)
+        if leaves:
+            player.active = False
 
-            # Check for jumps
-            if rounds % 6 == 0 and i > 0 and i < player.speed - 1:
-                continue
-
-            if cells[pos[1], pos[0]] != 0:
+        for _, dx, dy in written:
+            cx, cy = x + dx, y + dy
+            if occupy(cx, cy, player.player_id):
                 # Collision
                 player.active = False
-                cells[pos[1], pos[0]] = -1
-
-                if tuple(pos) in newly_occupied:  # Occupancy is from this round
-                    newly_occupied[tuple(pos)].active = False  # Other player loses, too
+                if (cx, cy) in newly_occupied:  # Occupancy is from this round
+                    newly_occupied[(cx, cy)].active = False  # Other player loses, too
             else:
                 # No collision
-                cells[pos[1], pos[0]] = player.player_id
-                newly_occupied[tuple(pos)] = player  # Remember this cell
-        player.x = pos[0]
-        player.y = pos[1]
+                newly_occupied[(cx, cy)] = player  # Remember this cell
+        player.x = x + end_x
+        player.y = y + end_y
 
     # Round completed
-    rounds += 1
+    return rounds + 1, newly_occupied.keys()
+
+
+def _simulate_bitboard(board, players, rounds, actions):
+    """Bitboard variant of `simulate`.
+
+    Works on plain integers instead of ndarrays, the result is identical to `simulate` on the occupancy.
+    """
+    width = board.width
+    bits = board.bits
+
+    def occupy(x, y, player_id):
+        nonlocal bits
+        bit = 1 << (y * width + x)
+        if bits & bit:
+            return True
+        bits |= bit
+        return False
+
+    rounds, newly_occupied = _move_players(players, rounds, actions, width, board.height, occupy)
+    board.bits = bits
+    return board, players, rounds, newly_occupied
 
-    return cells, players, rounds, newly_occupied.keys()
+
+def _can_interact(player, opponent, n_rounds):
+    """Check whether two players might occupy the same cell within the next `n_rounds` rounds."""
+    if not player.active or not opponent.active:
+        return False
+    distance = abs(player.x - opponent.x) + abs(player.y - opponent.y)
+    return distance <= max_distance(player.speed, n_rounds) + max_distance(opponent.speed, n_rounds)
+
+
+def _simulate_padded(board, players, rounds, actions, changes=None):
+    """Padded board variant of `simulate`.
+
+    Cells are read from the padded array directly, without going through the view of the inner cells.
+    """
+    height, width = board.shape
+    padded, padding = board.padded, board.padding
+
+    def occupy(x, y, player_id):
+        value = padded[y + padding, x + padding]
+        if changes is not None:
+            changes.append((y, x, value))
+        padded[y + padding, x + padding] = player_id if value == 0 else -1  # Collisions are marked with -1
+        return value != 0
+
+    rounds, newly_occupied = _move_players(players, rounds, actions, width, height, occupy)
+    return board, players, rounds, newly_occupied
 
 
 class SimulatedSpe_edEnv(Spe_edEnv):
@@ -69,7 +147,8 @@ class SimulatedSpe_edEnv(Spe_edEnv):
                 actions.append("change_nothing")
 
         # Perform simulation step
-        _, _, self.rounds, _ = simulate(self.cells, self.players, self.rounds, actions)
+        _, _, self.rounds, newly_occupied = simulate(self.cells, self.players, self.rounds, actions)
+        self._update_occupancy(newly_occupied)
         self.deadline = time.time() + self.time_limit
 
         done = sum(1 for p in self.players if p.active) < 2
@@ -108,6 +187,7 @@ class SimulatedSpe_edEnv(Spe_edEnv):
                 )
             )
         self.controlled_player = self.players[0]  # Control first player
+        self._update_occupancy()
         self.deadline = time.time() + self.time_limit
 
         return self._get_obs(self.controlled_player)
@@ -128,6 +208,13 @@ class Spe_edSimulator:
     """State for the simulate function.
 
     Keeps a history.
+
+    `cells` may either be a dense ndarray or a `Bitboard`. Bitboards only keep track of the occupancy, but copying
+    them for every child state is much cheaper.
+
+    Alternatively to `step`/`undo`, `make`/`unmake` modify the state in place and keep an undo log instead.
+
+    Once `zobrist_hash` has been accessed, it is updated incrementally by all following steps.
     """
     def __init__(self, cells, players, rounds, changed=[], parent=None):
         self.cells = cells
@@ -135,18 +222,329 @@ class Spe_edSimulator:
         self.rounds = rounds
         self.changed = changed
         self.parent = parent
+        self.undo_log = []
+        self._zobrist_hash = None
+
+    @property
+    def zobrist_keys(self):
+        """Zobrist keys for the board size of this state."""
+        height, width = self.cells.shape
+        return zobrist_keys(width, height)
+
+    @property
+    def zobrist_hash(self):
+        """64 bit Zobrist hash of occupancy, player states and jump phase, e.g. for transposition tables."""
+        if self._zobrist_hash is None:
+            self._zobrist_hash = self.zobrist_keys.hash(self.cells, self.players, self.rounds)
+        return self._zobrist_hash
 
     def step(self, actions):
         """Perform one simulation step"""
-        return Spe_edSimulator(
+        sim = Spe_edSimulator(
             *simulate(self.cells.copy(), [p.copy() for p in self.players], self.rounds, actions),
             parent=self,
         )
+        if self._zobrist_hash is not None:  # Update hash incrementally
+            keys = self.zobrist_keys
+            sim._zobrist_hash = keys.update(
+                self._zobrist_hash, sim.changed, [keys.player(p) for p in self.players], sim.players, self.rounds,
+                sim.rounds
+            )
+        return sim
 
     def undo(self):
         """Undo the last simulation step"""
         return self.parent
 
+    def _single_player_moves(self, actions):
+        """Compute the moves of the only player for all actions, without performing them.
+
+        The cells in the current direction are walked only once and shared by `change_nothing`, `slow_down` and
+        `speed_up`.
+
+        Returns:
+            List with `(direction_index, speed, written_cells, end_position)` for every action the player survives,
+            `None` otherwise.
+        """
+        player = self.players[0]
+        if not player.active:
+            return [None] * len(actions)
+
+        height, width = self.cells.shape
+        x, y = int(player.x), int(player.y)
+        jump = bool(self.rounds % 6 == 0)
+        direction, speed = player.direction_index, player.speed
+
+        def walk(d, n_steps):
+            """Check which of the next cells into direction `d` are free."""
+            dx, dy = direction_deltas[d]
+            return [self.cells[y + (i + 1) * dy, x + (i + 1) * dx] == 0 for i in range(n_steps)]
+
+        # Shared prefix of all straight moves
+        straight_free = walk(direction, min(speed + 1, steps_inside(direction, x, y, width, height)))
+
+        results = []
+        for action in actions:
+            if action == "turn_left":
+                new_direction, new_speed = (direction + 3) % 4, speed
+            elif action == "turn_right":
+                new_direction, new_speed = (direction + 1) % 4, speed
+            elif action == "slow_down":
+                new_direction, new_speed = direction, speed - 1
+            elif action == "speed_up":
+                new_direction, new_speed = direction, speed + 1
+            elif action == "change_nothing":
+                new_direction, new_speed = direction, speed
+            else:  # Invalid
+                results.append(None)
+                continue
+            if new_speed < 1 or new_speed > max_speed:
+                results.append(None)
+                continue
+
+            written, (end_x, end_y), leaves = clip_move(new_direction, new_speed, jump, x, y, width, height)
+            if leaves:
+                results.append(None)  # Player leaves the bounds
+                continue
+            free = straight_free if new_direction == direction else walk(new_direction, new_speed)
+            if not all(free[i] for i, _, _ in written):
+                results.append(None)  # Player collides
+                continue
+
+            results.append(
+                (new_direction, new_speed, [(x + dx, y + dy) for _, dx, dy in written], (x + end_x, y + end_y))
+            )
+        return results
+
+    def legal_actions(self, actions=spe_ed.actions):
+        """Check which actions the first player survives, without performing any of them.
+
+        Returns:
+            legal: bool ndarray, aligned with `actions`
+        """
+        if len(self.players) != 1:
+            return np.array([self.step([action]).player.active for action in actions], dtype=bool)
+        return np.array([m is not None for m in self._single_player_moves(actions)], dtype=bool)
+
+    def expand(self, actions=spe_ed.actions):
+        """Create the child states for all actions of the first player at once.
+
+        Boards are only copied for actions the player survives. Equivalent to calling `step([action])` for every action,
+        but without creating dead children.
+
+        Returns:
+            children: List of child states aligned with `actions`, `None` where the player dies.
+                The cells occupied by a child are available as `child.changed`.
+            legal: bool ndarray, aligned with `actions`
+        """
+        if len(self.players) != 1:  # General case, simulate all players
+            children = [self.step([action]) for action in actions]
+            children = [child if child.player.active else None for child in children]
+            return children, np.array([child is not None for child in children], dtype=bool)
+
+        player = self.players[0]
+        children = []
+        for m in self._single_player_moves(actions):
+            if m is None:
+                children.append(None)
+                continue
+            direction, speed, written, (x, y) = m
+
+            cells = self.cells.copy()
+            for cx, cy in written:
+                cells[cy, cx] = player.player_id
+            child = Spe_edSimulator(
+                cells, [Player(player.player_id, x, y, direction, speed, True, player.name)],
+                self.rounds + 1,
+                changed=written,
+                parent=self
+            )
+            if self._zobrist_hash is not None:  # Update hash incrementally
+                keys = self.zobrist_keys
+                child._zobrist_hash = keys.update(
+                    self._zobrist_hash, written, [keys.player(player)], child.players, self.rounds, child.rounds
+                )
+            children.append(child)
+        return children, np.array([child is not None for child in children], dtype=bool)
+
+    def rollout(self, actions):
+        """Perform a sequence of simulation steps at once.
+
+        Intermediate states are not created. For a single player, the whole path is checked against the initial board
+        and the cells written before, so the board is copied only once. The rollout stops, once the first player has
+        been eliminated. The resulting state is the same as after calling `step` for every round.
+
+        Args:
+            actions: Actions for every round, either as list with one action per player like in `step`, or a single
+                action of the first player
+
+        Returns:
+            sim: Final state
+            death_round: Round in which the first player was eliminated, `None` if it survived all rounds
+            newly_occupied: List of all cells `(x, y)` occupied during the rollout, also available as `sim.changed`
+        """
+        actions = [[a] if isinstance(a, str) else a for a in actions]
+        death_round = None
+        rounds = self.rounds
+
+        if len(self.players) != 1:  # General case, simulate all players on one copy of the board
+            cells, players, newly_occupied = self.cells.copy(), [p.copy() for p in self.players], []
+            for round_actions in actions:
+                if not players[0].active:
+                    break
+                cells, players, rounds, changed = simulate(cells, players, rounds, round_actions)
+                newly_occupied.extend(changed)
+                if not players[0].active:
+                    death_round = rounds - 1
+        else:
+            height, width = self.cells.shape
+            player = self.player.copy()
+            written = {}  # Value of every cell written during the rollout
+
+            def occupy(x, y, player_id):
+                occupied = (x, y) in written or self.cells[y, x] != 0
+                written[(x, y)] = -1 if occupied else player_id
+                return occupied
+
+            for round_actions in actions:
+                if not player.active:
+                    break
+                rounds, _ = _move_players([player], rounds, round_actions[:1], width, height, occupy)
+                if not player.active:
+                    death_round = rounds - 1
+
+            cells, players = self.cells.copy(), [player]
+            newly_occupied = [(x, y) for x, y in written if self.cells[y, x] == 0]
+            for (x, y), value in written.items():
+                cells[y, x] = value
+
+        sim = Spe_edSimulator(cells, players, rounds, changed=newly_occupied, parent=self)
+        if self._zobrist_hash is not None:  # Update hash incrementally
+            keys = self.zobrist_keys
+            sim._zobrist_hash = keys.update(
+                self._zobrist_hash, newly_occupied, [keys.player(p) for p in self.players], players, self.rounds, rounds
+            )
+        return sim, death_round, newly_occupied
+
+    def interacting_opponents(self, horizon):
+        """Indices of active opponents, which might collide with the first player within `horizon` rounds.
+
+        Opponents are excluded, if their Manhattan distance is larger than the maximum distance both players can
+        travel in this time.
+        """
+        return [i for i, p in enumerate(self.players[1:], 1) if _can_interact(self.player, p, horizon)]
+
+    def expand_joint(self, actions=spe_ed.actions, horizon=1, radius=None, default_action="change_nothing"):
+        """Lazily enumerate the child states for combinations of actions of the first player and its opponents.
+
+        Only opponents from `interacting_opponents(horizon)` are enumerated, all other opponents perform
+        `default_action`. Combinations are simulated in place on one copy of the state, and only children with distinct
+        outcomes near the first player are created. Two outcomes are equal, if the first player, the opponents still
+        able to interact within the remaining rounds and all cells occupied within `radius` of the first player are
+        the same.
+
+        Args:
+            actions: Actions to enumerate for the first player and the interacting opponents
+            horizon: Number of rounds the search looks ahead
+            radius: Manhattan distance to the first player, in which occupied cells are compared. Defaults to the
+                maximum distance any player can travel within `horizon` rounds.
+
+        Yields:
+            joint_actions: List with one action per player
+            child: Child state, with `changed` set to the newly occupied cells
+        """
+        if radius is None:
+            radius = max_distance(max_speed, horizon)
+        interacting = self.interacting_opponents(horizon)
+        sim = Spe_edSimulator(self.cells.copy(), [p.copy() for p in self.players], self.rounds)
+
+        seen = set()
+        for combination in itertools.product(actions, repeat=len(interacting) + 1):
+            joint_actions = [default_action] * len(self.players)
+            for i, action in zip([0] + interacting, combination):
+                joint_actions[i] = action
+            sim.make(joint_actions)
+
+            # Compare outcomes near the first player
+            player = sim.player
+            key = (
+                player.x, player.y, player.direction_index, player.speed, player.active,
+                tuple(
+                    (p.x, p.y, p.direction_index, p.speed) if _can_interact(player, p, horizon - 1) else p.active
+                    for p in (sim.players[i] for i in interacting)
+                ),
+                frozenset((x, y) for x, y in sim.changed if abs(x - player.x) + abs(y - player.y) <= radius),
+            )
+            if key not in seen:
+                seen.add(key)
+                child = Spe_edSimulator(
+                    sim.cells.copy(), [p.copy() for p in sim.players],
+                    sim.rounds,
+                    changed=list(sim.changed),
+                    parent=self
+                )
+                if self._zobrist_hash is not None:  # Update hash incrementally
+                    keys = self.zobrist_keys
+                    child._zobrist_hash = keys.update(
+                        self._zobrist_hash, child.changed, [keys.player(p) for p in self.players], child.players,
+                        self.rounds, child.rounds
+                    )
+                sim.unmake()
+                yield joint_actions, child
+            else:
+                sim.unmake()
+
+    def make(self, actions):
+        """Perform one simulation step in place.
+
+        Modifies `cells` and `players` directly, so the simulator has to own them. Only the written cells and the
+        previous player states are recorded, which allows to revert the step with `unmake`.
+        """
+        player_states = [(p.x, p.y, p.direction_index, p.speed, p.active) for p in self.players]
+        if self._zobrist_hash is not None:
+            keys = self.zobrist_keys
+            player_keys = [keys.player(p) for p in self.players]
+        if isinstance(self.cells, Bitboard):
+            cell_changes = self.cells.bits  # Integers are immutable, thus keeping a reference is enough
+            _, _, rounds, changed = simulate(self.cells, self.players, self.rounds, actions)
+        else:
+            cell_changes = []
+            _, _, rounds, changed = simulate(self.cells, self.players, self.rounds, actions, cell_changes)
+
+        self.undo_log.append((cell_changes, player_states, self.rounds, self.changed, self._zobrist_hash))
+        if self._zobrist_hash is not None:  # Update hash incrementally
+            self._zobrist_hash = keys.update(
+                self._zobrist_hash, changed, player_keys, self.players, self.rounds, rounds
+            )
+        self.rounds = rounds
+        self.changed = changed
+        return self
+
+    def unmake(self):
+        """Revert the last step performed by `make`."""
+        cell_changes, player_states, self.rounds, self.changed, self._zobrist_hash = self.undo_log.pop()
+        if isinstance(self.cells, Bitboard):
+            self.cells.bits = cell_changes
+        else:
+            for y, x, value in reversed(cell_changes):
+                self.cells[y, x] = value
+        for p, (x, y, direction, speed, active) in zip(self.players, player_states):
+            p.x, p.y, p.direction_index, p.speed, p.active = x, y, direction, speed, active
+        return self
+
+    def to_bytes(self):
+        """Serialize this state into a compact byte string, see `environments.serialization`."""
+        from environments.serialization import state_to_bytes
+
+        return state_to_bytes(self)
+
+    @staticmethod
+    def from_bytes(data, bitboard=False):
+        """Deserialize a state created by `to_bytes`."""
+        from environments.serialization import state_from_bytes
+
+        return state_from_bytes(data, bitboard)
+
     @property
     def player(self):
         """Shorthand for the first player"""
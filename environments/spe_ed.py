@@ -1,9 +1,14 @@
 from dataclasses import dataclass
+import gzip
 import json
+from collections.abc import Sequence
 import numpy as np
 
 actions = ("turn_left", "turn_right", "slow_down", "speed_up", "change_nothing")
 
+# File suffix of gzip compressed JSON logs
+compressed_suffix = ".json.gz"
+
 
 @dataclass(frozen=True)
 class Direction(np.lib.mixins.NDArrayOperatorsMixin):
@@ -36,18 +41,44 @@ directions[2] = Direction(2, "left", np.pi, np.array([-1, 0]))
 directions[3] = Direction(3, "up", np.pi * 3 / 2, np.array([0, -1]))
 directions.setflags(write=False)  # Prevent accidentally writing
 directions_by_name = {d.name: d for d in directions}
+_directions = tuple(directions)  # Faster indexing than the object array
+
+# Direction index after turning, indexed by direction index
+turn_left_table = (3, 0, 1, 2)
+turn_right_table = (1, 2, 3, 0)
 
 
-@dataclass
 class Player:
-    """Player object."""
-    player_id: int
-    x: int
-    y: int
-    direction: str
-    speed: int
-    active: bool
-    name: str = None
+    """Player object.
+
+    Uses `__slots__` and stores the direction as index into `directions`, which keeps copies and actions cheap.
+    `direction` gives the corresponding `Direction` object.
+    """
+    __slots__ = ("player_id", "x", "y", "direction_index", "speed", "active", "name")
+    __hash__ = None
+
+    def __init__(self, player_id, x, y, direction, speed, active, name=None):
+        """Initialize Player.
+
+        Args:
+            direction: `Direction` or index into `directions`
+        """
+        self.player_id = player_id
+        self.x = x
+        self.y = y
+        self.direction = direction
+        self.speed = speed
+        self.active = active
+        self.name = name
+
+    @property
+    def direction(self):
+        """Direction object of `direction_index`."""
+        return _directions[self.direction_index]
+
+    @direction.setter
+    def direction(self, direction):
+        self.direction_index = int(direction) if isinstance(direction, (int, np.integer)) else direction.index
 
     @property
     def position(self):
@@ -56,7 +87,10 @@ class Player:
 
     def copy(self):
         """Create a copy of this player."""
-        return Player(self.player_id, self.x, self.y, self.direction, self.speed, self.active, self.name)
+        p = Player.__new__(Player)
+        p.player_id, p.x, p.y, p.direction_index, p.speed, p.active, p.name = \
+            self.player_id, self.x, self.y, self.direction_index, self.speed, self.active, self.name
+        return p
 
     def perform(self, action):
         """Let the player perform one action.
@@ -67,9 +101,9 @@ class Player:
             return
 
         if action == 'turn_left':
-            self.direction = self.direction.turn_left()
+            self.direction_index = turn_left_table[self.direction_index]
         elif action == 'turn_right':
-            self.direction = self.direction.turn_right()
+            self.direction_index = turn_right_table[self.direction_index]
         elif action == 'slow_down':
             self.speed -= 1
             if self.speed < 1:  # Check minimum speed
@@ -87,9 +121,16 @@ class Player:
         if self.__class__ == other.__class__:
             return (
                 self.player_id == other.player_id and self.x == other.x and self.y == other.y and
-                self.direction == other.direction and self.speed == other.speed and self.active == other.active
+                self.direction_index == other.direction_index and self.speed == other.speed and
+                self.active == other.active and self.name == other.name
             )
-        return False
+        return NotImplemented
+
+    def __repr__(self):
+        return (
+            f"Player(player_id={self.player_id!r}, x={self.x!r}, y={self.y!r}, direction={self.direction!r}, "
+            f"speed={self.speed!r}, active={self.active!r}, name={self.name!r})"
+        )
 
     def __str__(self):
         return f"{self.player_id}: ({self.x}, {self.y}), {self.direction}, speed={self.speed}, active={self.active}"
@@ -165,6 +206,42 @@ def infer_action(player_before, player_after):
     return "change_nothing"
 
 
+def read_log(file_name):
+    """Read the JSON states of a plain or gzip compressed JSON log file."""
+    if str(file_name).endswith(compressed_suffix):
+        with gzip.open(file_name, "rt") as f:
+            return json.load(f)
+    with open(file_name) as f:
+        return json.load(f)
+
+
+class _LazyStates(Sequence):
+    """Sequence of states, which are parsed on first access and cached afterwards."""
+    def __init__(self, n, parse):
+        """Initialize _LazyStates.
+
+        Args:
+            n: Number of states
+            parse: Function creating the state at a given index
+        """
+        self._parse = parse
+        self._cache = [None] * n
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __getitem__(self, t):
+        if isinstance(t, slice):
+            return [self[i] for i in range(*t.indices(len(self)))]
+        if self._cache[t] is None:
+            self._cache[t] = self._parse(t % len(self))
+        return self._cache[t]
+
+    def parsed(self):
+        """Iterate over all states parsed so far."""
+        return (state for state in self._cache if state is not None)
+
+
 class SavedGame:
     """Save game representation.
 
@@ -184,12 +261,60 @@ class SavedGame:
             data: JSON object
         """
         self.data = data
-        self.cell_states = [np.array(state['cells'], dtype=np.int8) for state in data]
-        self.player_states = [
-            [Player.from_json(player_id, player_data) for player_id, player_data in state['players'].items()]
-            for state in data
-        ]
-        self.height, self.width = self.cell_states[0].shape
+        self._init_states(
+            len(data),
+            len(data[0]['cells']),
+            len(data[0]['cells'][0]),
+            data[0].get('you'),
+            lambda t: np.array(data[t]['cells'], dtype=np.int8),
+            lambda t: [Player.from_json(*player) for player in data[t]['players'].items()],
+        )
+
+    @classmethod
+    def from_compact(cls, game):
+        """Create a saved game from a `environments.compact_log.CompactGame`.
+
+        `data` is `None` for these games.
+        """
+        saved_game = cls.__new__(cls)
+        saved_game.data = None
+        saved_game._init_states(len(game), game.height, game.width, game.you, game.cells, game.players)
+        return saved_game
+
+    def _init_states(self, n_states, height, width, you, read_cells, read_players):
+        """Set up lazily parsed states, given functions reading cells and players of a single round."""
+        self.height, self.width = height, width
+        self.you = you
+        self._read_cells = read_cells
+        self._read_players = read_players
+        self._swapped_id = None  # Player id swapped with player 1, see `move_controlled_player_to_front`
+
+        # States are parsed lazily per round
+        self.cell_states = _LazyStates(n_states, self._parse_cells)
+        self.player_states = _LazyStates(n_states, self._parse_players)
+
+    def _parse_cells(self, t):
+        cells = self._read_cells(t)
+        if self._swapped_id is not None:
+            self._swap_cells(cells, self._swapped_id)
+        return cells
+
+    def _parse_players(self, t):
+        players = self._read_players(t)
+        if self._swapped_id is not None:
+            self._swap_players(players, self._swapped_id)
+        return players
+
+    @staticmethod
+    def _swap_cells(cells, player_id):
+        your_cells = cells == player_id
+        other_cells = cells == 1
+        cells[your_cells] = 1
+        cells[other_cells] = player_id
+
+    @staticmethod
+    def _swap_players(players, player_id):
+        players[0], players[player_id - 1] = players[player_id - 1], players[0]
 
     def infer_actions(self, t):
         """Compute action taken by all players at timestep `t`."""
@@ -222,24 +347,26 @@ class SavedGame:
         """Return iterable of all player ids in this game."""
         return (p.player_id for p in self.player_states[0])
 
-    @property
-    def you(self):
-        """Player_id of controlled player."""
-        return self.data[0]["you"]
-
     @classmethod
     def load(cls, file_name):
         """Load a saved game.
 
         Args:
-            file_name: Path to the save game in json format.
+            file_name: Path to the save game in plain or gzip compressed json or compact format, see
+                `environments.compact_log`.
 
         Returns:
             SavedGame object
         """
-        with open(file_name) as f:
-            data = json.load(f)
+        from environments import compact_log
+
+        if str(file_name).endswith(compact_log.suffix):
+            game = compact_log.read_compact(file_name)
+            if game.running:
+                raise ValueError(f"Game not completed: {file_name}")
+            return cls.from_compact(game)
 
+        data = read_log(file_name)
         if data[-1]["running"]:
             raise ValueError(f"Game not completed: {file_name}")
 
@@ -252,22 +379,19 @@ class SavedGame:
         return Spe_edSimulator(self.cell_states[t], self.player_states[t], t + 1)
 
     def move_controlled_player_to_front(self):
-        """Changes cell and player states, as if controlled player was at first position."""
+        """Changes cell and player states, as if controlled player was at first position.
+
+        Only states parsed so far are changed in place, all others are swapped when they are parsed.
+        """
         you = self.you
         if you is None:
             raise ValueError("The is no controlled player in this game.")
         if you != 1:
-            for t in range(len(self.data)):
-                # Swap cells
-                cells = self.cell_states[t]
-                your_cells = cells == you
-                other_cells = cells == 1
-                cells[your_cells] = 1
-                cells[other_cells] = you
-
-                # Swap players
-                players = self.player_states[t]
-                players[0], players[you - 1] = players[you - 1], players[0]
+            for cells in self.cell_states.parsed():
+                self._swap_cells(cells, you)
+            for players in self.player_states.parsed():
+                self._swap_players(players, you)
+            self._swapped_id = you if self._swapped_id is None else None  # Swapping twice restores the order
 
     def get_obs(self, t, player_id):
         """Get obersation from the perspective of a specific player.
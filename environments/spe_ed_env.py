@@ -17,6 +17,7 @@ class Spe_edEnv(gym.Env):
         self.players = []
         self.controlled_player = None
         self.rounds = 1
+        self._occupancy = None  # Shared occupancy of all observations, see `_get_obs`
 
         self.viewer = None
 
@@ -57,20 +58,38 @@ class Spe_edEnv(gym.Env):
             action = "change_nothing"
         return action
 
+    def _update_occupancy(self, newly_occupied=None):
+        """Update the shared occupancy after `cells` changed.
+
+        Args:
+            newly_occupied: Cells `(x, y)` occupied since the last update, as returned by `simulate`. If not given, the
+                occupancy is recomputed from `cells`.
+        """
+        if newly_occupied is None or self._occupancy is None:
+            self._occupancy = self.cells != 0
+            view = self._occupancy.view()
+            view.setflags(write=False)  # Prevent accidentally writing
+            self._occupancy_view = Cells(view)
+        else:
+            for x, y in newly_occupied:
+                self._occupancy[y, x] = True
+
     def _get_obs(self, player):
         """Get obersation from the perspective of a specific player.
 
-        Returned values can be used as input for a policy.
+        Returned values can be used as input for a policy. The cells are a read-only view of an occupancy array, which
+        is shared by all players and updated in place by `_update_occupancy`. Policies that keep them beyond the current
+        round have to copy them.
 
         Args:
             player_id: Id of the player to get the observation for
         """
-        occupancy = self.cells != 0
-        occupancy.setflags(write=False)  # Prevent accidentally writing
+        if self._occupancy is None:
+            self._update_occupancy()
         you = player
         opponents = [p for p in self.players if p.active and p.player_id != player.player_id]
         deadline = self.deadline - 0.5  # Add safety margin of 0.5s
-        return Cells(occupancy), you, opponents, self.rounds, deadline
+        return self._occupancy_view, you, opponents, self.rounds, deadline
 
     def game_state(self):
         """Get current game state as dict."""
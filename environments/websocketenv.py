@@ -64,6 +64,7 @@ class WebsocketEnv(Spe_edEnv):
         self.width = state["width"]
         self.height = state["height"]
         self.cells = np.array(state["cells"])
+        self._update_occupancy()
         self.controlled_player = [player for player in self.players if int(player.player_id) == state["you"]][0]
 
         logging.info(
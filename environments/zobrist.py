@@ -0,0 +1,78 @@
+from functools import lru_cache
+import numpy as np
+from environments.moves import max_speed
+
+zobrist_seed = 2021
+
+
+def _random_keys(size, *key):
+    """Draw reproducible 64 bit random keys."""
+    return np.random.default_rng([zobrist_seed, *key]).integers(0, 2**64, size=size, dtype=np.uint64, endpoint=False)
+
+
+class ZobristKeys:
+    """Random keys for Zobrist hashing of game states of one board size.
+
+    The hash of a state is the XOR of the keys of all occupied cells, one key per player and one key for the jump phase
+    `rounds % 6`. The key of a player covers position, direction and speed if active, otherwise only the player id.
+    Thus, it can be updated by XOR-ing only the keys of changed cells and players.
+    """
+    def __init__(self, width, height):
+        """Draw the keys for a board of the given size, the same for every instance."""
+        self.width = width
+        self.height = height
+        self.cell_array = _random_keys(width * height, width, height)
+        self.cells = self.cell_array.tolist()
+        self.phases = _random_keys(6, 0).tolist()
+        self._players = {}
+
+    def _player_tables(self, player_id):
+        """Get (positions, directions, speeds, inactive) keys of a player."""
+        if player_id not in self._players:
+            keys = _random_keys(self.width * self.height + 4 + max_speed + 2, self.width, self.height, player_id)
+            keys = keys.tolist()
+            self._players[player_id] = (
+                keys[:self.width * self.height],
+                keys[self.width * self.height:self.width * self.height + 4],
+                keys[self.width * self.height + 4:-1],
+                keys[-1],
+            )
+        return self._players[player_id]
+
+    def player(self, player):
+        """Get key of a player state."""
+        positions, directions, speeds, inactive = self._player_tables(player.player_id)
+        if not player.active:
+            return inactive
+        return positions[player.y * self.width + player.x] ^ directions[player.direction_index] ^ speeds[player.speed]
+
+    def occupancy(self, cells):
+        """Get combined key of all occupied cells."""
+        return int(np.bitwise_xor.reduce(self.cell_array[np.asarray(cells).ravel() != 0]))
+
+    def hash(self, cells, players, rounds):
+        """Compute the hash of a game state from scratch."""
+        h = self.occupancy(cells) ^ self.phases[rounds % 6]
+        for p in players:
+            h ^= self.player(p)
+        return h
+
+    def update(self, h, newly_occupied, players_before, players_after, rounds_before, rounds_after):
+        """Update hash `h` of a state after a simulation step.
+
+        Args:
+            newly_occupied: Cells `(x, y)` that have been occupied in the step
+            players_before: Keys of the players before the step, see `player`
+        """
+        h ^= self.phases[rounds_before % 6] ^ self.phases[rounds_after % 6]
+        for x, y in newly_occupied:
+            h ^= self.cells[y * self.width + x]
+        for key, p in zip(players_before, players_after):
+            h ^= key ^ self.player(p)
+        return h
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(width, height):
+    """Get shared `ZobristKeys` for a board size."""
+    return ZobristKeys(width, height)
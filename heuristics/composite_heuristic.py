@@ -31,6 +31,40 @@ class CompositeHeuristic(Heuristic):
 
         return score
 
+    def score_batch(self, cells, players, opponents, rounds, deadline):
+        """Compute the combined heuristic scores, using the batched implementations of all heuristics."""
+        scores = np.zeros(len(players))
+        for weight, heuristic in zip(self.weights, self.heuristics):
+            scores += weight * heuristic.score_batch(cells, players, opponents, rounds, deadline)
+
+            if time.time() >= deadline:  # Check deadline
+                break
+
+        return scores
+
+    def score_candidates(self, candidates, opponents, deadline):
+        """Compute the combined heuristic scores of all candidates, heuristic by heuristic."""
+        scores = np.zeros(len(candidates))
+        for weight, heuristic in zip(self.weights, self.heuristics):
+            scores += weight * heuristic.score_candidates(candidates, opponents, deadline)
+
+            if time.time() >= deadline:  # Check deadline
+                break
+
+        return scores
+
+    def replay_random_numbers(self, enable):
+        """Replay the random numbers of all heuristics."""
+        for heuristic in self.heuristics:
+            heuristic.replay_random_numbers(enable)
+
+    def upper_bound(self, cells, player, opponents, rounds):
+        """Combine the upper bounds of all heuristics."""
+        return sum(
+            weight * heuristic.upper_bound(cells, player, opponents, rounds)
+            for weight, heuristic in zip(self.weights, self.heuristics)
+        )
+
     def __str__(self):
         """Get readable representation."""
         return "CompositeHeuristic(" + \
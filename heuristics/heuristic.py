@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+import time
+import numpy as np
+from environments.spe_ed import Cells
 
 
 class Heuristic(ABC):
@@ -19,3 +22,62 @@ class Heuristic(ABC):
             The value is normalized in the range [0, 1].
         """
         pass
+
+    def score_batch(self, cells, players, opponents, rounds, deadline):
+        """Compute the score values of a batch of game states with the same opponents.
+
+        Heuristics may override this with a vectorized implementation. By default, `score` is evaluated for each game
+        state as `Cells` until the deadline is reached.
+
+        Args:
+            cells: (N, H, W) binary ndarray of stacked cell occupancies.
+            players: List of N controlled players
+            opponents: List of other active players
+            rounds: (N, ) numbers of the rounds
+            deadline: A deadline after which the heuristic must return immediately.
+
+        Returns:
+            scores: (N, ) ndarray of scores, `0` for game states not evaluated before the deadline.
+        """
+        scores = np.zeros(len(players))
+        for n, player in enumerate(players):
+            scores[n] = self.score(Cells(np.asarray(cells[n])), player, opponents, int(rounds[n]), deadline)
+            if time.time() >= deadline:  # Check deadline
+                break
+        return scores
+
+    def score_candidates(self, candidates, opponents, deadline):
+        """Compute the score values of alternative game states of the controlled player, e.g. after each action.
+
+        Heuristics may override this to share effort between the candidates. By default, `score` is evaluated for each
+        candidate, with the remaining time split evenly between the remaining candidates.
+
+        Args:
+            candidates: List of (cells, player, rounds) tuples of the game states
+            opponents: List of other active players
+            deadline: A deadline after which the heuristic must return immediately.
+
+        Returns:
+            scores: (N, ) ndarray of scores
+        """
+        scores = np.zeros(len(candidates))
+        for n, (cells, player, rounds) in enumerate(candidates):
+            sub_deadline = time.time() + (deadline - time.time()) / (len(candidates) - n)
+            scores[n] = self.score(cells, player, opponents, rounds, sub_deadline)
+        return scores
+
+    def replay_random_numbers(self, enable):
+        """Replay the same random numbers in every call of `score`, while enabled.
+
+        Scores of different game states are then computed with common random numbers, which lowers the variance of
+        their differences. Enabling it again draws new random numbers. Heuristics without randomness ignore this.
+        """
+        pass
+
+    def upper_bound(self, cells, player, opponents, rounds):
+        """Compute an upper bound on the score of all states following the given one.
+
+        Searches may skip states, whose bound does not exceed the best score found so far. Without a known bound, this
+        is the maximum score of 1.
+        """
+        return 1.0
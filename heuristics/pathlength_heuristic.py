@@ -1,6 +1,12 @@
+from bisect import bisect_right
+from functools import lru_cache
 import time
+import numpy as np
 from heuristics.heuristic import Heuristic
-from environments.simulator import Spe_edSimulator
+from environments.moves import max_speed, moves, steps_inside
+from environments.spe_ed import turn_left_table, turn_right_table
+from environments.zobrist import zobrist_keys
+from state_representation import reachable_region_size
 
 # Reorder actions to hit early out condition as fast as possible
 # change_nothing first, as it's the most common action
@@ -9,50 +15,164 @@ from environments.simulator import Spe_edSimulator
 ordered_actions = ("change_nothing", "turn_left", "turn_right", "slow_down", "speed_up")
 
 
+def _apply(action, direction, speed):
+    """Direction index and speed after an action."""
+    if action == "turn_left":
+        return turn_left_table[direction], speed
+    if action == "turn_right":
+        return turn_right_table[direction], speed
+    if action == "slow_down":
+        return direction, speed - 1
+    if action == "speed_up":
+        return direction, speed + 1
+    return direction, speed
+
+
+@lru_cache(maxsize=None)
+def _min_cells(n_steps):
+    """Minimum number of cells written by paths of each length, for every speed and jump phase.
+
+    Speed decreases by at most one per step, and jumps write at most two cells.
+
+    Returns:
+        min_cells: `min_cells[speed][phase][k]` is the minimum number of cells written within `k` steps, when the
+            first step starts at a round with `round % 6 == phase`
+    """
+    min_cells = [None]
+    for speed in range(1, max_speed + 1):
+        tables = []
+        for phase in range(6):
+            cells = [0]
+            for t in range(1, n_steps + 1):
+                min_speed = max(1, speed - t)
+                cells.append(cells[-1] + (min(min_speed, 2) if (phase + t - 1) % 6 == 0 else min_speed))
+            tables.append(cells)
+        min_cells.append(tables)
+    return min_cells
+
+
 class PathLengthHeuristic(Heuristic):
     """Performs a random probe run and evaluates length of the path."""
-    def __init__(self, n_steps, time_limit=None):
+    def __init__(self, n_steps, time_limit=None, table_size=2**16, bound_after=100):
         """Initialize PathLengthHeuristic.
 
         Args:
             n_steps: Number of steps to look into the future
-            expanded_node_limit: Threshold to prevent long execution times
+            time_limit: Threshold to prevent long execution times
+            table_size: Maximum number of entries of the transposition table
+            bound_after: Number of expanded nodes, after which the region size bound is computed, `None` to disable it.
+                Most searches end early on open boards, where computing the bound does not pay off.
         """
         self.n_steps = n_steps
         self.time_limit = time_limit
+        self.table_size = table_size
+        self.bound_after = bound_after
 
-    def score(self, cells, player, opponents, rounds, deadline):
-        """Perform a DFS to seach the longest path reachable."""
-        expanded = 0
+    def max_path_length(self, cells, player, rounds):
+        """Upper bound on the length of any path of `player`, see `state_representation.reachable_region_size`.
 
-        if self.time_limit is not None:
-            deadline = min(time.time() + self.time_limit, deadline)
+        Every step writes at least one cell of the region the player can reach. Steps at higher speeds write more.
+        """
+        if not player.active:
+            return 0
+        min_cells = _min_cells(self.n_steps)[player.speed][rounds % 6]
+        return bisect_right(min_cells, reachable_region_size(cells, player.x, player.y)) - 1
 
-        def _dfs(sim):
-            """Depth-first search"""
-            nonlocal expanded
+    def upper_bound(self, cells, player, opponents, rounds):
+        """Upper bound on the score of `player` in all following states."""
+        return self.max_path_length(cells, player, rounds) / self.n_steps
 
-            path_length = sim.rounds - rounds
-            if path_length >= self.n_steps or time.time() > deadline:  # Maximum search depth reached
-                return path_length  # Early out
+    def score(self, cells, player, opponents, rounds, deadline):
+        """Perform a DFS to seach the longest path reachable.
 
-            for action in ordered_actions:
-                sub_sim = sim.step([action])
-                if not sub_sim.player.active:  # Backtrack
-                    continue
+        The search moves a single player through the move tables on a flat list of free cells, which is restored after
+        each move. Nodes reached by different move orders with the same trail are looked up in a transposition table,
+        keyed by position, direction, speed, depth and the Zobrist hash of the cells occupied during the search. The
+        table keeps exact path lengths and upper bounds of nodes, which could not improve on the path found before.
+
+        Once the search takes longer, branches are cut, which cannot exceed the longest path found so far. The bound is
+        computed from the size of the region reachable from the root, minus the cells written on the way to a node.
+        """
+        if self.time_limit is not None:
+            deadline = min(time.time() + self.time_limit, deadline)
 
-                sub_path_length = _dfs(sub_sim)
-                if sub_path_length >= self.n_steps:  # Maximum search depth reached
-                    return sub_path_length  # Early out
+        if not player.active:
+            return 0.0
 
-                if sub_path_length > path_length:
-                    path_length = sub_path_length
+        height, width = cells.shape
+        free = (np.asarray(cells) == 0).ravel().tolist()
+        cell_keys = zobrist_keys(width, height).cells
+        table = {}  # (path length, exact) of completely searched nodes, otherwise the path length is an upper bound
+        timed_out = False
+        expanded = 0
+        region_size = None  # Cells reachable from the root, computed once the search takes longer
+        min_cells = _min_cells(self.n_steps)
 
-            expanded += 1  # Count expanded nodes
+        def _dfs(x, y, direction, speed, path_length, trail, n_written, alpha):
+            """Depth-first search, modifies `free` in place and restores it.
 
-            return path_length
+            Returns the longest path length if it exceeds `alpha`, otherwise an upper bound, which is at most `alpha`.
+            """
+            nonlocal timed_out, expanded, region_size
 
-        path_length = _dfs(Spe_edSimulator(cells, [player], rounds))
+            if path_length >= self.n_steps:  # Maximum search depth reached
+                return path_length  # Early out
+            if time.time() > deadline:
+                timed_out = True  # Results are incomplete from now on
+                return path_length
+
+            key = (trail, x, y, direction, speed, path_length)
+            upper = self.n_steps
+            entry = table.get(key)
+            if entry is not None:
+                value, exact = entry
+                if exact or value <= alpha:
+                    return value
+                upper = value  # Search again with a lower alpha, but the bound still holds
+
+            expanded += 1
+            if region_size is None and self.bound_after is not None and expanded > self.bound_after:
+                region_size = reachable_region_size(cells, player.x, player.y)
+            if region_size is not None:
+                phase = (rounds + path_length) % 6
+                upper = min(upper, path_length + bisect_right(min_cells[speed][phase], region_size - n_written) - 1)
+                if upper <= alpha:
+                    return upper  # Cannot improve on the longest path found so far
+
+            jump = (rounds + path_length) % 6 == 0
+            best = path_length
+            for action in ordered_actions:
+                new_direction, new_speed = _apply(action, direction, speed)
+                if new_speed < 1 or new_speed > max_speed:
+                    continue  # Dead
+                if new_speed > steps_inside(new_direction, x, y, width, height):
+                    continue  # Leaves the bounds
+                move = moves[new_direction][new_speed][jump]
+                written = [(y + dy) * width + x + dx for _, dx, dy in move.written]
+                if not all(free[i] for i in written):
+                    continue  # Collision
+
+                new_trail = trail
+                for i in written:
+                    free[i] = False
+                    new_trail ^= cell_keys[i]
+                sub_path_length = _dfs(
+                    x + move.end[0], y + move.end[1], new_direction, new_speed, path_length + 1, new_trail,
+                    n_written + len(written), max(alpha, best)
+                )
+                for i in written:
+                    free[i] = True
+
+                if sub_path_length > best:
+                    best = sub_path_length
+                if best >= upper:  # Longest possible path found
+                    break  # Early out
+
+            if not timed_out and (len(table) < self.table_size or key in table):
+                table[key] = (best, best > alpha)  # Exact result or upper bound
+            return best
+
+        path_length = _dfs(player.x, player.y, player.direction_index, player.speed, 0, 0, 0, -1)
 
         # return the board state score value
         return path_length / self.n_steps
@@ -1,59 +1,119 @@
 import time
 from heuristics.heuristic import Heuristic
 import numpy as np
+from environments.batch_simulator import BatchSimulator, warm_up
 from environments.simulator import Spe_edSimulator
-from environments import spe_ed
 
 
 class RandomProbingHeuristic(Heuristic):
     """Performs a random probe run and evaluates the board state afterwards by the given heuristics."""
-    def __init__(self, heuristic, n_steps, n_probes, seed=None):
+    def __init__(self, heuristic, n_steps, n_probes, seed=None, successive_halving=False):
         """Initialize RandomProbingHeuristic.
 
         Args:
             heuristic: Heuristic to evaluate for each probe
             n_steps: Number of random steps for each probe run
-            n_probes: Number of probe runs
+            n_probes: Number of probe runs, with `successive_halving` the average number of probe runs per candidate
             seed: Random seed of the action selection
+            successive_halving: Allocate probes of `score_candidates` adaptively, see `score_candidates`
         """
         self.heuristic = heuristic
         self.n_steps = n_steps
         self.n_probes = n_probes
         self.rng = np.random.default_rng(seed)
+        self.successive_halving = successive_halving
+        self._replay_seed = None  # Seed of the random numbers replayed in every call of `score`, if enabled
+        warm_up()  # Not during the first probe runs, which have a deadline
+
+    def _probe(self, candidates, opponents, n_probes, rng, common, deadline):
+        """Perform `n_probes` probe runs from each candidate state in lockstep and score their final states.
+
+        Args:
+            candidates: List of (cells, player, rounds) with equal board sizes
+            common: Use the same random numbers for the probes of all candidates
+
+        Returns:
+            scores: (len(candidates), n_probes) ndarray of scores
+        """
+        probes = BatchSimulator.from_simulators(
+            [Spe_edSimulator(np.asarray(cells), [player], rounds) for cells, player, rounds in candidates
+             for _ in range(n_probes)]
+        )
+        n_games = probes.n_games
+        running = np.ones(n_games, dtype=bool)
+        for _ in range(self.n_steps):
+            legal = probes.legal_actions() & running[:, None]
+            running = legal.any(axis=1)
+            if not running.any():  # No way out in any probe
+                break
+            if common:
+                random_numbers = np.tile(rng.random((n_probes, legal.shape[1])), (len(candidates), 1))
+            else:
+                random_numbers = rng.random(legal.shape)
+            # Random legal action, as the legal action with the highest random number
+            actions = np.argmax(np.where(legal, random_numbers, -1), axis=1)
+            probes.step(actions[:, None], mask=running)
+
+        scores = self.heuristic.score_batch(
+            probes.cells != 0, [probes.players(n)[0] for n in range(n_games)], opponents, probes.rounds, deadline
+        )
+        return scores.reshape(len(candidates), n_probes)
 
     def score(self, cells, player, opponents, rounds, deadline):
-        """Perform one recursive probe run with random actions and returns the number of steps survived."""
-        def perform_probe_run(env):
-            """Simulate the given environment for maximum of `n_steps` with valid random steps or
-            until the player cannot make a valid move, return the environment.
-            """
-            for _ in range(self.n_steps):
-                dead_end = True
-                for action in self.rng.permutation(spe_ed.actions):
-                    env = env.step([action])
-                    if env.players[0].active:
-                        # We survive, go to next step
-                        dead_end = False
-                        break
-                    else:
-                        env = env.undo()  # We die, try alternative action
-                if dead_end:  # No way out
-                    break
-            return env
-
-        score = 0
-        for _ in range(self.n_probes):
-            # perform a single probe run
-            env = perform_probe_run(Spe_edSimulator(cells, [player], rounds))
-            probe_score = self.heuristic.score(env.cells, env.players[0], opponents, env.rounds, deadline)
-            # remember only the score of the best probe run
-            score = max(probe_score, score)
-
-            if time.time() >= deadline:  # Check deadline
+        """Perform probe runs with random actions and evaluate the best final state.
+
+        All probes are advanced in lockstep as one `BatchSimulator`. In each step, every probe picks a uniformly random
+        action among those it survives, and stops once there is none. The final states are scored in one call of
+        `Heuristic.score_batch`.
+
+        Random numbers are drawn for all five actions of each probe and step, whether the probe is still running or
+        not. With `replay_random_numbers` enabled, every call therefore ranks the actions of each probe in the same
+        order, so probes from similar states follow similar paths.
+        """
+        rng = self.rng if self._replay_seed is None else np.random.default_rng(self._replay_seed)
+        scores = self._probe([(cells, player, rounds)], opponents, self.n_probes, rng, False, deadline)
+
+        # return the board state score value of the best probe run
+        return max(0.0, float(scores.max()))
+
+    def score_candidates(self, candidates, opponents, deadline):
+        """Compute the scores of alternative game states, allocating probes by successive halving if enabled.
+
+        The budget of `n_probes` per candidate is split evenly between `ceil(log2(len(candidates)))` rounds. In each
+        round, the budget of the round is split between the remaining candidates, and afterwards only the better half of
+        them, and those tied with it, are kept. So later rounds spend more probe runs on fewer close candidates. Dropped
+        candidates keep the score of their best probe run so far. Once the deadline is reached, no more rounds start.
+
+        The probes of all candidates in a round are advanced together. With `replay_random_numbers` enabled, they share
+        their random numbers.
+        """
+        if not self.successive_halving:
+            return super().score_candidates(candidates, opponents, deadline)
+
+        rng = self.rng if self._replay_seed is None else np.random.default_rng(self._replay_seed)
+        scores = np.zeros(len(candidates))
+        contenders = np.arange(len(candidates))
+        n_rounds = max(1, int(np.ceil(np.log2(len(candidates)))))
+        round_budget = self.n_probes * len(candidates) // n_rounds
+        for _ in range(n_rounds):
+            n_probes = max(1, round_budget // len(contenders))
+            probe_scores = self._probe(
+                [candidates[c] for c in contenders], opponents, n_probes, rng, self._replay_seed is not None, deadline
+            )
+            scores[contenders] = np.maximum(scores[contenders], probe_scores.max(axis=1))
+            if time.time() >= deadline:
                 break
 
-        # return the board state score value
-        return score
+            # Keep the better half and all candidates tied with it
+            cutoff = np.sort(scores[contenders])[::-1][(len(contenders) - 1) // 2]
+            contenders = contenders[scores[contenders] >= cutoff]
+
+        return scores
+
+    def replay_random_numbers(self, enable):
+        """Replay the random action streams of the probes, and the random numbers of the heuristic."""
+        self._replay_seed = int(self.rng.integers(2**63)) if enable else None
+        self.heuristic.replay_random_numbers(enable)
 
     def __str__(self):
         """Get readable representation."""
@@ -61,4 +121,5 @@ class RandomProbingHeuristic(Heuristic):
             f"heuristic={str(self.heuristic)}, " + \
             f"n_steps={self.n_steps}, " + \
             f"n_probes={self.n_probes}, " + \
+            f"successive_halving={self.successive_halving}, " + \
             ")"
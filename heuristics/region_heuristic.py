@@ -3,6 +3,10 @@ from scipy.ndimage import morphology
 from scipy import ndimage
 import numpy as np
 
+# Connectivity within each board of a stack, but not across boards
+_cross = ndimage.generate_binary_structure(2, 1)
+_batch_structure = np.stack([np.zeros_like(_cross), _cross, np.zeros_like(_cross)])
+
 
 class RegionHeuristic(Heuristic):
     """Heuristic evaluation the the of the region the player is in.
@@ -62,6 +66,36 @@ class RegionHeuristic(Heuristic):
 
         return score
 
+    def score_batch(self, cells, players, opponents, rounds, deadline):
+        """Compute the scores of all game states at once, by labelling the stacked boards."""
+        if self.closing_iterations > 0:
+            cells = morphology.binary_closing(
+                cells, structure=_cross[None], iterations=self.closing_iterations, border_value=1
+            )
+        if self.opening_iterations > 0:
+            cells = morphology.binary_opening(cells, structure=_cross[None], iterations=self.opening_iterations)
+
+        empty = cells == 0
+        for n, player in enumerate(players):
+            empty[n, player.y, player.x] = True
+            for p in opponents:
+                empty[n, p.y, p.x] = True
+
+        labelled, _ = ndimage.label(empty, structure=_batch_structure)
+        label_sizes = np.bincount(labelled.ravel())
+        board_size = np.prod(cells.shape[1:])
+
+        scores = np.zeros(len(players))
+        for n, player in enumerate(players):
+            regions = np.array([labelled[n, p.y, p.x] for p in [player] + opponents])
+            region_sizes = label_sizes[regions] / np.array([np.sum(regions == region) for region in regions])
+            region_sizes /= board_size
+
+            scores[n] = region_sizes[0]
+            if self.include_opponent_regions and len(opponents) > 0:
+                scores[n] *= (1 - np.mean(region_sizes[1:]))
+        return scores
+
     def __str__(self):
         """Get readable representation."""
         return "RegionHeuristic(" + \
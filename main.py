@@ -82,7 +82,7 @@ def show_logfile(log_file, window_size=default_window_size):
         s += "\n".join(str(p) for p in game.player_states[t]) + "\n"
 
         s += "\nActions:\n"
-        if t + 1 < len(game.data):
+        if t + 1 < len(game.cell_states):
             s += "\n".join(str(a) for a in game.infer_actions(t)) + "\n"
         else:
             s += "\n".join("win" if p.active else "inactive" for p in game.player_states[t]) + "\n"
@@ -99,7 +99,7 @@ def show_logfile(log_file, window_size=default_window_size):
 
     plt.tight_layout()
     plt.subplots_adjust(bottom=0.1, right=0.6)
-    slider = Slider(plt.axes([0.1, 0.025, 0.8, 0.03]), 't', 0, len(game.data) - 1, valinit=0, valstep=1, valfmt="%d")
+    slider = Slider(plt.axes([0.1, 0.025, 0.8, 0.03]), 't', 0, game.rounds, valinit=0, valstep=1, valfmt="%d")
     text_box = fig.text(0.61, 0.975, format_state(0), ha='left', va='top')
 
     def change_t(val):
@@ -111,7 +111,7 @@ def show_logfile(log_file, window_size=default_window_size):
     plt.show()
 
 
-def render_logfile(log_file, fps=10, silent=False, window_size=default_window_size):
+def render_logfile(log_file, fps=10, silent=False, window_size=default_window_size, game_name=None):
     """Render logfile to mp4.
 
     Resulting .mp4 is placed alongside the .json file.
@@ -120,9 +120,11 @@ def render_logfile(log_file, fps=10, silent=False, window_size=default_window_si
         log_file: Log file to render.
         fps: FPS of generated video.
         silent: Show no progress bar.
+        game_name: If given, `log_file` is a game archive and the game of this name is rendered.
     """
     from visualization import Spe_edAx, render_video
     from imageio_ffmpeg import get_ffmpeg_exe
+    from statistics import log_name
     import subprocess
     import tempfile
 
@@ -130,7 +132,13 @@ def render_logfile(log_file, fps=10, silent=False, window_size=default_window_si
         """Create the name of a temp file with given suffix without opening it."""
         return Path(tempfile.gettempdir()) / (next(tempfile._get_candidate_names()) + suffix)
 
-    game = SavedGame.load(log_file)
+    if game_name is not None:
+        from environments.archive import GameArchive
+
+        game = GameArchive(log_file).load(game_name)
+    else:
+        game = SavedGame.load(log_file)
+        game_name = log_name(log_file)
     if game.you:
         game.move_controlled_player_to_front()
 
@@ -144,7 +152,7 @@ def render_logfile(log_file, fps=10, silent=False, window_size=default_window_si
 
     def frames():
         """Draw all game states"""
-        for i in tqdm(range(len(game.cell_states)), desc=f"Rendering {log_file.name}", disable=silent):
+        for i in tqdm(range(len(game.cell_states)), desc=f"Rendering {game_name}", disable=silent):
             viewer.update(game.cell_states[i], game.player_states[i])
             fig.canvas.draw()
 
@@ -167,7 +175,7 @@ def render_logfile(log_file, fps=10, silent=False, window_size=default_window_si
             str(tmp_video), "-i",
             str(tmp_thumbnail), "-y", "-map", "0", "-map", "1", "-c", "copy", "-disposition:v:1", "attached_pic", "-v",
             "warning",
-            str(log_file.parent / (log_file.name[:-5] + ".mp4"))
+            str(log_file.parent / (game_name + ".mp4"))
         ]
     )
 
@@ -189,11 +197,17 @@ if __name__ == "__main__":
     parser.add_argument('--render-file', type=str, default=None, help='File to render to. Should end with .mp4')
     parser.add_argument('--sim', action='store_true', help='The simulator environment runs a local simulation of Spe_ed instead of using the webserver.')
     parser.add_argument('--log-file', type=str, default=None, help='Path to a log file, used to load and replay games.')
-    parser.add_argument('--log-dir', type=str, default=None, help='Directory for storing or retrieving logs.')
+    parser.add_argument(
+        '--log-dir', type=str, default=None, help='Directory for storing or retrieving logs, or a game archive to read.'
+    )
     parser.add_argument(
         '--t-config', type=str, default='./tournament/tournament_config.py', help='Path of the tournament config file containing which settings to run.'
     )
     parser.add_argument('--upload', action='store_true', help='Upload generated log to cloud server.')
+    parser.add_argument('--compact-logs', action='store_true', help='Write logs in compact binary format.')
+    parser.add_argument(
+        '--compression-level', type=int, default=6, help='gzip level of JSON logs, negative writes uncompressed JSON.'
+    )
     parser.add_argument('--fps', type=int, default=10, help='FPS for rendering.')
     parser.add_argument(
         '--cores', type=int, default=None, help='Number of cores for multiprocessing, default uses all.'
@@ -202,22 +216,29 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     if args.mode == 'render_logdir':
+        from environments.archive import GameArchive, is_archive
+        from statistics import get_log_files, log_name
+
         log_dir = Path(args.log_dir)
-        if not log_dir.is_dir():
-            logging.error(f"{log_dir} is not a directory")
+        if is_archive(log_dir):  # Render all games of an archive next to it
+            jobs = [
+                (log_dir, args.fps, True, default_window_size, name)
+                for name in GameArchive(log_dir).names
+                if not (log_dir.parent / (name + ".mp4")).exists()
+            ]
+        elif log_dir.is_dir():
+            jobs = [
+                (log_file, args.fps, True)
+                for log_file in get_log_files(log_dir)
+                if not (log_dir / (log_name(log_file) + ".mp4")).exists()
+            ]
+        else:
+            logging.error(f"{log_dir} is neither a directory nor a game archive")
             quit(1)
 
-        log_files = []
-        for log_file in log_dir.iterdir():
-            if not log_file.name.endswith(".json"):
-                continue
-            if (log_dir / (log_file.name[:-5] + ".mp4")).exists():
-                continue
-            log_files.append(log_file)
-
-        with mp.Pool(args.cores) as pool, tqdm(desc="Rendering games", total=len(log_files)) as pbar:
-            for log_file in log_files:
-                pool.apply_async(render_logfile, (log_file, args.fps, True), callback=lambda _: pbar.update())
+        with mp.Pool(args.cores) as pool, tqdm(desc="Rendering games", total=len(jobs)) as pbar:
+            for job in jobs:
+                pool.apply_async(render_logfile, job, callback=lambda _: pbar.update())
             pool.close()
             pool.join()
 
@@ -239,11 +260,12 @@ if __name__ == "__main__":
 
         create_tournament_plots(log_dir, log_dir.parent)
     elif args.mode == 'plot':
+        from environments.archive import is_archive
         from statistics import create_plots
 
         log_dir = Path(args.log_dir)
-        if not log_dir.is_dir():
-            logging.error(f"{log_dir} is not a directory")
+        if not log_dir.is_dir() and not is_archive(log_dir):
+            logging.error(f"{log_dir} is neither a directory nor a game archive")
             quit(1)
 
         create_plots(log_dir, log_dir.parent / "statistics.csv")
@@ -260,7 +282,12 @@ if __name__ == "__main__":
                         remote_dir="logs/"
                     ).upload
                 )
-            logger = Spe_edLogger(args.log_dir, logger_callbacks)
+            logger = Spe_edLogger(
+                args.log_dir,
+                logger_callbacks,
+                compact=args.compact_logs,
+                compression_level=args.compression_level if args.compression_level >= 0 else None,
+            )
         else:
             logger = None
 
@@ -3,6 +3,7 @@ import time
 from queue import PriorityQueue
 from policies.policy import Policy
 from environments.simulator import Spe_edSimulator
+from environments.boards import OverlayBoard
 from environments import spe_ed
 from state_representation import occupancy_map
 
@@ -26,22 +27,28 @@ class ActionSearchPolicy(Policy):
             occ_maps = [occupancy_map(cells, opponents, rounds, depth=d + 1) for d in range(self.occupancy_map_depth)]
 
         states = PriorityQueue()
-        states.put((0, [], Spe_edSimulator(cells, [player], rounds), 1))  # Current state as inital
+        # Queued states only store their changes relative to the current cells
+        states.put((0, [], Spe_edSimulator(OverlayBoard(cells), [player], rounds), 1))  # Current state as inital
 
         actions_scores = []
+        best_score = 0
         expanded = 0
         while not states.empty() and expanded < self.expanded_node_limit and time.time() < deadline:
             _, prev_actions, prev_state, prev_freeness = states.get()
+            # Upper bound of all states following `prev_state`, computed at most once when needed. As it also holds
+            # for the successors of its children, it is not computed for every child.
+            bound = None
 
-            for action in spe_ed.actions:
-                state = prev_state.step([action])
-                if not state.player.active:
+            next_states, legal = prev_state.expand(spe_ed.actions)
+            for action, state in zip(spe_ed.actions, next_states):
+                if state is None:  # Player dies
                     continue
 
                 actions = prev_actions + [action]
 
                 # Evaluate heuristic
-                score = self.heuristic.score(state.cells, state.player, opponents, state.rounds, time.time() + 0.1)
+                dense_cells = state.cells.to_cells()
+                score = self.heuristic.score(dense_cells, state.player, opponents, state.rounds, time.time() + 0.1)
                 if self.occupancy_map_depth > 0:
                     occ_map = occ_maps[min(state.rounds - rounds, self.occupancy_map_depth) - 1]
                     freeness = prev_freeness * prod(1 - occ_map[cell[1], cell[0]] for cell in state.changed)
@@ -51,9 +58,16 @@ class ActionSearchPolicy(Policy):
 
                 actions_scores.append((actions, score))
                 if len(actions) < self.depth_limit:  # Search depth
-                    states.put((-score, actions, state, freeness))
-
-            if len(prev_actions) == 0 and states.qsize() == 1:  # Only one possible root action
+                    # Skip states, whose successors cannot exceed the best score found so far
+                    if score < best_score and bound is None:
+                        bound = self.heuristic.upper_bound(
+                            prev_state.cells.to_cells(), prev_state.player, opponents, prev_state.rounds
+                        )
+                    if score >= best_score or bound * freeness > best_score:
+                        states.put((-score, actions, state, freeness))
+                best_score = max(best_score, score)
+
+            if len(prev_actions) == 0 and legal.sum() == 1:  # Only one possible root action
                 break
 
             expanded += 1
@@ -1,4 +1,5 @@
 from policies.policy import Policy
+from environments.moves import direction_deltas
 
 
 class CirclePolicy(Policy):
@@ -9,13 +10,14 @@ class CirclePolicy(Policy):
     def act(self, cells, player, opponents, round, deadline):
         """Choose action."""
         # directions - relative to player direction
-        forward = player.direction
-        left = player.direction.turn_left()
-        right = player.direction.turn_right()
+        forward = player.direction_index
+        left = (forward + 3) % 4
+        right = (forward + 1) % 4
 
         # if_free - relative to player position
-        def is_free(pos):
-            return cells.is_free(player.position + pos)
+        def is_free(direction):
+            dx, dy = direction_deltas[direction]
+            return cells.is_free((player.x + dx, player.y + dy))
 
         if is_free(right):
             return "turn_right"
@@ -74,14 +74,14 @@ def computeOccupiedCells(cells, players):
 def computePathLength(cells, players):
     """Evaluates the 'PathLengthHeuristic' with constant parameters."""
     path_length_heuristic = PathLengthHeuristic(n_steps=200)
-    return path_length_heuristic.score(cells, players[0], [], 0, deadline=time.time + 0.1)  # TODO Magic number
+    return path_length_heuristic.score(cells, players[0], [], 0, deadline=time.time() + 0.1)  # TODO Magic number
 
 
 def tiebreakerFunc(env, remaining_actions, score_func=computeRegionSize, eval_func=max, morph_kwargs={}):
     """A general tiebreaker function to decide given an environment which actions are preferable and should be executed.
 
     Args:
-        env: The current game state given in `Spe_edSimulator`
+        env: The current game state given in `Spe_edSimulator`, which is modified in place and restored afterwards.
         remaining_actions: A list of actions to choose from.
         score_func: A function, which accepts 'cells' and 'players' and returns a scalar value.
         eval_func: accepts either `max` or `min` to decide, whether prefer a lower or higher score.
@@ -102,11 +102,11 @@ def tiebreakerFunc(env, remaining_actions, score_func=computeRegionSize, eval_fu
         print("ERROR: function not handled")
 
     for action in scores:
-        env = env.step([action])
+        env.make([action])
         if env.players[0].active:
             cells = applyMorphology(env.cells, **morph_kwargs)
             scores[action] = score_func(cells, env.players)
-        env = env.undo()
+        env.unmake()
 
     score_list = list(scores.values())
     remaining_actions = [k for k, v in scores.items() if v == eval_func(score_list)]
@@ -130,8 +130,10 @@ class EndgamePolicy(Policy):
 
     def act(self, cells, player, opponents, rounds, deadline):
         """Choose action."""
-        env = Spe_edSimulator(cells, [player], rounds)
-        remaining_actions = self.actions
+        env = Spe_edSimulator(cells.copy(), [player.copy()], rounds)
+        # skip actions we don't survive, unless there is no other choice
+        legal = env.legal_actions(self.actions)
+        remaining_actions = [a for a, l in zip(self.actions, legal) if l] if legal.any() else self.actions
 
         # bigger region is always better
         remaining_actions, _ = tiebreakerFunc(env, remaining_actions, computeRegionSize, max)
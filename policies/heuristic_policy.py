@@ -1,4 +1,3 @@
-import time
 from math import prod
 import numpy as np
 from policies.policy import Policy
@@ -10,19 +9,25 @@ from state_representation import occupancy_map
 class HeuristicPolicy(Policy):
     """Policy that moved into that direction with the most promising Heuristic.
 
-    A single action is performed in every valid direction and evaluated by the given metric.
+    A single action is performed in every valid direction and evaluated by the given metric. All resulting states are
+    passed to `Heuristic.score_candidates` at once, so heuristics may share their effort between the actions, e.g.
+    `RandomProbingHeuristic` with `successive_halving`.
     """
-    def __init__(self, heuristic, occupancy_map_depth=0, actions=None):
+    def __init__(self, heuristic, occupancy_map_depth=0, actions=None, common_random_numbers=False):
         """Initialize HeuristicPolicy.
 
         Args:
             heuristic: `Heuristic` that will be evaluated after one action of the player was performed.
             occupancy_map_depth: defines the depth of the occupoancy map. If > 0, uses it to weight scores.
             actions: considers only given actions, if `None` uses all given action.
+            common_random_numbers: Evaluate all actions with the same random numbers, see
+                `Heuristic.replay_random_numbers`. Random probes then start the same action streams after each action,
+                so differences of scores stem from the actions rather than from the random probes.
         """
         self.heuristic = heuristic
         self.occupancy_map_depth = occupancy_map_depth
         self.actions = spe_ed.actions if actions is None else actions
+        self.common_random_numbers = common_random_numbers
 
     def act(self, cells, player, opponents, rounds, deadline):
         """Chooses action based on weighted heuristic scores."""
@@ -31,17 +36,25 @@ class HeuristicPolicy(Policy):
             occ_map = occupancy_map(cells, opponents, rounds, self.occupancy_map_depth)
         cur_state = Spe_edSimulator(cells, [player], rounds)
 
-        for a, action in enumerate(self.actions):
-            # perform a single action
-            next_state = cur_state.step([action])
-            # evaluate the heuristic, if the player is active
-            if next_state.player.active:
-                sub_deadline = time.time() + (deadline - time.time()) / len(self.actions)
-                scores[a] = self.heuristic.score(
-                    next_state.cells, next_state.player, opponents, next_state.rounds, sub_deadline
+        # perform all actions at once, dead children are None
+        next_states, _ = cur_state.expand(self.actions)
+        # evaluate the heuristic for all actions the player survives
+        alive = [a for a, next_state in enumerate(next_states) if next_state is not None]
+        if len(alive) > 0:
+            if self.common_random_numbers:
+                self.heuristic.replay_random_numbers(True)
+            try:
+                scores[alive] = self.heuristic.score_candidates(
+                    [(next_states[a].cells, next_states[a].player, next_states[a].rounds) for a in alive], opponents,
+                    deadline
                 )
-                if self.occupancy_map_depth > 0:  # Factor in occupancy of newly occupied cells
-                    scores[a] *= prod(1 - occ_map[y, x] for x, y in next_state.changed)
+            finally:
+                if self.common_random_numbers:
+                    self.heuristic.replay_random_numbers(False)
+
+        if self.occupancy_map_depth > 0:  # Factor in occupancy of newly occupied cells
+            for a in alive:
+                scores[a] *= prod(1 - occ_map[y, x] for x, y in next_states[a].changed)
 
         # select action with the highest score
         return self.actions[np.argmax(scores)]
@@ -52,4 +65,5 @@ class HeuristicPolicy(Policy):
             f"heuristic={str(self.heuristic)}, " + \
             f"occupancy_map_depth={self.occupancy_map_depth}, " + \
             f"actions={self.actions}, " + \
+            f"common_random_numbers={self.common_random_numbers}, " + \
             ")"
@@ -2,6 +2,7 @@ import time
 from queue import PriorityQueue
 from policies.policy import Policy
 from environments.simulator import Spe_edSimulator
+from environments.boards import OverlayBoard
 from environments import spe_ed
 
 
@@ -23,7 +24,8 @@ class Maximin_SearchPolicy(Policy):
         action_selection = spe_ed.actions if self.actions is None else self.actions
 
         states = PriorityQueue()
-        states.put((0, -1, 0, [], Spe_edSimulator(cells, [player], rounds)))  # Current state as inital
+        # Queued states only store their changes relative to the current cells
+        states.put((0, -1, 0, [], Spe_edSimulator(OverlayBoard(cells), [player], rounds)))  # Current state as inital
 
         best_action = action_selection[0]
         best_score = 0
@@ -36,15 +38,17 @@ class Maximin_SearchPolicy(Policy):
             if -prev_score_neg <= lower_bound:  # Check bound
                 continue
 
-            for action in action_selection:
-                state = prev_state.step([action])
-                if not state.player.active:
+            next_states, _ = prev_state.expand(action_selection)
+            for action, state in zip(action_selection, next_states):
+                if state is None:  # Player dies
                     continue
 
                 actions = prev_actions + [action]
 
                 # Evaluate heuristic
-                score = self.heuristic.score(state.cells, state.player, opponents, state.rounds, time.time() + 0.1)
+                score = self.heuristic.score(
+                    state.cells.to_cells(), state.player, opponents, state.rounds, time.time() + 0.1
+                )
                 score = min(score, -prev_score_neg)
 
                 if lower_bound == 0 and score > best_score:
@@ -1,4 +1,5 @@
 from policies.policy import Policy
+from environments.moves import direction_deltas
 
 
 class MazeWalkerPolicy(Policy):
@@ -12,14 +13,15 @@ class MazeWalkerPolicy(Policy):
 
     def act(self, cells, player, opponents, round, deadline):
         """Choose action."""
-        def is_free(pos):
+        def is_free(direction, distance=1):
             """is_free, but relative to player position."""
-            return cells.is_free(player.position + pos)
+            dx, dy = direction_deltas[direction]
+            return cells.is_free((player.x + distance * dx, player.y + distance * dy))
 
         # directions - relative to player direction
-        forward = player.direction
-        left = player.direction.turn_left()
-        right = player.direction.turn_right()
+        forward = player.direction_index
+        left = (forward + 3) % 4
+        right = (forward + 1) % 4
 
         if self.hit_wall:  # follow the wall
             if is_free(left):
@@ -1,4 +1,5 @@
 from policies.policy import Policy
+from environments.moves import direction_deltas
 
 
 class SpiralPolicy(Policy):
@@ -13,16 +14,17 @@ class SpiralPolicy(Policy):
     def act(self, cells, player, opponents, round, deadline):
         """Choose action."""
         # directions - relative to player direction
-        forward = player.direction
-        left = player.direction.turn_left()
-        right = player.direction.turn_right()
+        forward = player.direction_index
+        left = (forward + 3) % 4
+        right = (forward + 1) % 4
 
-        def is_free(pos):
+        def is_free(direction, distance=1):
             """is_free relative to player position."""
-            return cells.is_free(player.position + pos)
+            dx, dy = direction_deltas[direction]
+            return cells.is_free((player.x + distance * dx, player.y + distance * dy))
 
         # check if we can create a spiral loop
-        if is_free(forward) and is_free(2 * forward):
+        if is_free(forward) and is_free(forward, 2):
             return "change_nothing"
 
         if self.clockwise:
@@ -1,9 +1,13 @@
 from state_representation.occupancy import occupancy_map
 from state_representation.window import padded_window
 from state_representation.abstraction import windowed_abstraction
+from state_representation.reachability import reachable_region_size, reachable_states, reachability_map
 
 __all__ = [
     "occupancy_map",
     "padded_window",
+    "reachability_map",
+    "reachable_region_size",
+    "reachable_states",
     "windowed_abstraction",
 ]
@@ -18,24 +18,27 @@ def occupancy_map(cells, opponents, rounds, depth=3, death_discount=1):
     N_actions = len(spe_ed.actions)
 
     def _occupancy_recursion(sim, probability=1, level=1):
-        probs = np.zeros_like(cells, dtype=float)
+        probs = {}
         # Sum probs fro all actions
         for a in spe_ed.actions:
-            sub_sim = sim.step([a])
+            sim.make([a])
             sub_probability = probability / N_actions  # Assume uniform distribution
-            if not sub_sim.player.active:
+            if not sim.player.active:
                 sub_probability *= death_discount
 
-            probs += (sim.cells != sub_sim.cells) * sub_probability
+            for cell in sim.changed:
+                probs[cell] = probs.get(cell, 0) + sub_probability
 
-            if level < depth and sub_sim.player.active:
-                _occupancy_recursion(sub_sim, sub_probability, level + 1)
+            if level < depth and sim.player.active:
+                _occupancy_recursion(sim, sub_probability, level + 1)
+            sim.unmake()
 
-        # Update occupancy
-        occ[:] = 1 - (1 - occ) * (1 - probs)
+        # Update occupancy, cells not occupied by any action remain unchanged
+        for (x, y), p in probs.items():
+            occ[y, x] = 1 - (1 - float(occ[y, x])) * (1 - p)
 
     for opponent in opponents:
         if opponent.active:
-            _occupancy_recursion(Spe_edSimulator(cells, [opponent], rounds))
+            _occupancy_recursion(Spe_edSimulator(cells.copy(), [opponent.copy()], rounds))
 
     return occ
@@ -0,0 +1,125 @@
+import numpy as np
+from scipy import ndimage
+from environments.moves import direction_deltas, moves, steps_inside, max_speed
+
+
+def _successors(direction, speed):
+    """Kinematic `(direction, speed)` after each valid action."""
+    yield (direction + 3) % 4, speed  # turn_left
+    yield (direction + 1) % 4, speed  # turn_right
+    if speed > 1:
+        yield direction, speed - 1  # slow_down
+    if speed < max_speed:
+        yield direction, speed + 1  # speed_up
+    yield direction, speed  # change_nothing
+
+
+def reachable_states(cells, player, rounds, depth, exact=True):
+    """Compute the states a player can reach within the next rounds by breadth-first search.
+
+    Instead of a tree of action sequences, the lattice of states `(x, y, direction, speed)` is expanded round by round
+    and identical states are merged. The jump phase is implied by the round.
+
+    In exact mode, states also include the trail of the player since the start, so two action sequences are only merged
+    if they occupied the same cells. Otherwise, the trail is ignored and only `cells` is considered for collisions,
+    which yields a superset of the reachable states, but keeps the number of states per round bounded by the board.
+
+    Args:
+        cells, player, rounds: Game state
+        depth: Number of rounds to look ahead
+        exact: Whether to keep track of the trail
+
+    Returns:
+        states: List with the set of `(x, y, direction, speed)` reachable after each round
+        occupied: List with the set of cells `(x, y)`, which may be occupied in each round
+    """
+    height, width = cells.shape
+    frontier = set()
+    if player.active:
+        frontier.add((int(player.x), int(player.y), player.direction_index, player.speed, frozenset()))
+
+    states, occupied = [], []
+    for level in range(depth):
+        jump = (rounds + level) % 6 == 0
+        next_frontier = set()
+        level_occupied = set()
+        for x, y, direction, speed, trail in frontier:
+            for new_direction, new_speed in _successors(direction, speed):
+                if new_speed > steps_inside(new_direction, x, y, width, height):
+                    continue  # Player leaves the bounds
+                move = moves[new_direction][new_speed][jump]
+                written = [(x + dx, y + dy) for _, dx, dy in move.written]
+                if any(cells[cy, cx] != 0 or (cx, cy) in trail for cx, cy in written):
+                    continue  # Player collides
+                level_occupied.update(written)
+                next_frontier.add(
+                    (
+                        x + move.end[0], y + move.end[1], new_direction, new_speed,
+                        trail.union(written) if exact else trail
+                    )
+                )
+        frontier = next_frontier
+        states.append({s[:4] for s in frontier})
+        occupied.append(level_occupied)
+    return states, occupied
+
+
+def reachable_region_size(cells, x, y):
+    """Upper bound on the number of free cells a player at `(x, y)` can ever occupy.
+
+    Free cells are labeled in 4-connected regions. Starting from the regions next to the player, regions are merged if a
+    jump can cross into them. A jump in direction `d` from a position `c` writes `c + d` and lands on `c + s * d` for
+    `3 <= s <= max_speed`. Jump phases and speeds are ignored, so the result is admissible.
+
+    Returns:
+        size: Number of free cells in all regions the player might reach
+    """
+    free = np.asarray(cells) == 0
+    height, width = free.shape
+    labels, n_labels = ndimage.label(free)
+
+    # Positions, from which the player may start a move
+    positions = np.zeros_like(free)
+    positions[y, x] = True
+    reached = np.zeros(n_labels + 1, dtype=bool)  # Label 0 are occupied cells
+    while True:
+        landed = np.zeros(n_labels + 1, dtype=bool)
+        for dx, dy in direction_deltas:
+            for s in (1, *range(3, max_speed + 1)):
+                # Positions `c` with `c + s * d` inside the bounds
+                ys, ye = max(0, -s * dy), height - max(0, s * dy)
+                xs, xe = max(0, -s * dx), width - max(0, s * dx)
+                if ys >= ye or xs >= xe:
+                    continue
+                start = positions[ys:ye, xs:xe]
+                if s > 1:  # Jumps write `c + d` as well
+                    start = start & free[ys + dy:ye + dy, xs + dx:xe + dx]
+                landed[labels[ys + s * dy:ye + s * dy, xs + s * dx:xe + s * dx][start]] = True
+        landed[0] = False
+        if not (landed & ~reached).any():
+            break
+        reached |= landed
+        positions = reached[labels]
+    return int(np.count_nonzero(reached[labels]))
+
+
+def reachability_map(cells, opponents, rounds, depth, exact=False):
+    """Compute the earliest round offset, in which any opponent may occupy each cell.
+
+    Args:
+        cells, opponents, rounds: Game state
+        depth: Number of rounds to look ahead
+        exact: See `reachable_states`, defaults to the approximation for deep projections
+
+    Returns:
+        reach: int ndarray, the number of rounds until a cell may be occupied, `0` if it cannot be reached
+    """
+    reach = np.zeros(cells.shape, dtype=np.int32)
+    for opponent in opponents:
+        if opponent.active:
+            _, occupied = reachable_states(cells, opponent, rounds, depth, exact)
+            for level in range(depth):
+                for x, y in occupied[level]:
+                    if reach[y, x] == 0 or reach[y, x] > level + 1:
+                        reach[y, x] = level + 1
+    return reach
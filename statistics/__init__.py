@@ -1,4 +1,4 @@
-from statistics.log_files import get_log_files
+from statistics.log_files import get_log_files, log_name
 from statistics.stats import fetch_statistics
 from statistics.plots import create_plots
 from statistics.plots import create_tournament_plots
@@ -6,5 +6,6 @@ __all__ = [
     "create_plots",
     "fetch_statistics",
     "get_log_files",
+    "log_name",
     "create_tournament_plots",
 ]
@@ -1,4 +1,9 @@
 from pathlib import Path
+from environments import compact_log
+from environments.spe_ed import compressed_suffix
+
+# Suffixes of plain and compressed JSON and compact log files
+log_suffixes = (".json", compressed_suffix, compact_log.suffix)
 
 
 def get_log_files(log_dir, prefix=""):
@@ -8,4 +13,13 @@ def get_log_files(log_dir, prefix=""):
         prefix: Can be used to filter by date, e.g. use `"20201106-10"` to only get logfiles from the 6th November
                 from 10:00 til 10:59.
     """
-    return [f for f in Path(log_dir).iterdir() if f.name.endswith(".json") and f.name.startswith(prefix)]
+    return [f for f in Path(log_dir).iterdir() if f.name.endswith(log_suffixes) and f.name.startswith(prefix)]
+
+
+def log_name(log_file):
+    """Name of a log file without suffix, e.g. the date of the game."""
+    name = Path(log_file).name
+    for suffix in log_suffixes:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
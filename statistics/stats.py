@@ -3,39 +3,60 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
+from environments.archive import GameArchive, is_archive
 from environments.spe_ed import SavedGame
-from statistics.log_files import get_log_files
+from statistics.log_files import get_log_files, log_name
 
 
 def fetch_statistics(log_dir, csv_file, key_column='date'):
-    # Seach for unprocessed log files
-    known_log_files = set(pd.read_csv(csv_file)[key_column]) if Path(csv_file).exists() else set()
-    new_log_files = [
-        f for f in get_log_files(log_dir) if f.name[:-5] not in known_log_files and f.name[:-5] != "_name_mapping"
-    ]  # exclude name mapping
+    """Update the statistics in `csv_file` with all new games and return them.
 
-    if len(new_log_files) > 0:
-        # Process new log files
+    Args:
+        log_dir: Directory of log files or a game archive, see `environments.archive`
+    """
+    known_log_files = set(pd.read_csv(csv_file)[key_column]) if Path(csv_file).exists() else set()
+    if is_archive(log_dir):
+        # Archives already contain statistics in their index
+        results = [
+            (
+                entry["name"],
+                entry["rounds"],
+                entry["names"][entry["winner"] - 1] if entry["winner"] is not None else None,
+                entry["names"][entry["you"] - 1] if entry["you"] is not None else None,
+                entry["names"],
+                entry["width"],
+                entry["height"],
+            ) for entry in GameArchive(log_dir).index if entry["name"] not in known_log_files
+        ]
+        new_log_files = []
+    else:
         results = []
-        for log_file in tqdm(new_log_files, desc="Parsing new log files"):
-            try:
-                game = SavedGame.load(log_file)
-            except Exception:
-                logging.exception(f"Failed to load {log_file}")
-                continue
-
-            results.append(
-                (
-                    log_file.name[:-5],  # name of game
-                    game.rounds,  # rounds
-                    game.winner.name if game.winner is not None else None,  # winner
-                    game.names[game.you - 1] if game.you is not None else None,  # you
-                    game.names,  # names
-                    game.width,
-                    game.height,
-                )
+        # Seach for unprocessed log files
+        new_log_files = [
+            f for f in get_log_files(log_dir) if log_name(f) not in known_log_files and log_name(f) != "_name_mapping"
+        ]  # exclude name mapping
+
+    # Process new log files
+    for log_file in tqdm(new_log_files, desc="Parsing new log files"):
+        try:
+            game = SavedGame.load(log_file)
+        except Exception:
+            logging.exception(f"Failed to load {log_file}")
+            continue
+
+        results.append(
+            (
+                log_name(log_file),  # name of game
+                game.rounds,  # rounds
+                game.winner.name if game.winner is not None else None,  # winner
+                game.names[game.you - 1] if game.you is not None else None,  # you
+                game.names,  # names
+                game.width,
+                game.height,
             )
+        )
 
+    if len(results) > 0:
         # Append new statisics
         df = pd.DataFrame(results, columns=[key_column, "rounds", "winner", "you", "names", "width", "height"])
         df.to_csv(csv_file, mode='a', header=len(known_log_files) == 0, index=False)
@@ -1,5 +1,8 @@
 import unittest
+from numpy.testing import assert_array_equal
 from environments.spe_ed import Cells, SavedGame
+import numpy as np
+from environments.boards import Bitboard, OverlayBoard, PaddedBoard
 from tests.heuristic_test import default_round1_board
 
 
@@ -35,3 +38,82 @@ class TestCells(unittest.TestCase):
         self.assertEqual(cells.is_free([4, 5]), False)
         self.assertEqual(cells.is_free([5, 4]), False)
         self.assertEqual(cells.is_free([5, -5]), False)
+
+
+class TestBitboard(unittest.TestCase):
+    def test_roundtrip(self):
+        """Converting to a bitboard and back keeps the occupancy."""
+        game = SavedGame.load(r"tests/logs/20201019-182018.json")
+        cells = game.cell_states[50]
+        board = Bitboard.from_cells(cells)
+
+        self.assertEqual(board.shape, cells.shape)
+        assert_array_equal(board, cells != 0)
+        assert_array_equal(board == 0, cells == 0)
+
+    def test_is_free(self):
+        """Check test_is_free."""
+        cells = Cells(default_round1_board()[0])
+        board = Bitboard.from_cells(cells)
+
+        for x in range(-1, 6):
+            for y in range(-1, 6):
+                self.assertEqual(board.is_free([x, y]), cells.is_free([x, y]), f"x={x}, y={y}")
+
+
+class TestOverlayBoard(unittest.TestCase):
+    def test_copy_on_write(self):
+        """Writes only affect the written board."""
+        cells = Cells(default_round1_board()[0])
+        board = OverlayBoard(cells)
+        board[4, 4] = 1
+        copied = board.copy()
+        copied[0, 4] = 1
+
+        self.assertFalse(board.is_free([4, 4]))
+        self.assertTrue(board.is_free([4, 0]))
+        self.assertFalse(copied.is_free([4, 0]))
+        self.assertFalse(cells[4, 4] or cells[0, 4])  # Root stays unchanged
+        self.assertEqual(len(copied.changes), 2)
+
+    def test_to_cells(self):
+        """Dense representation includes all changes."""
+        cells = Cells(default_round1_board()[0])
+        board = OverlayBoard(cells)
+        board[4, 4] = 1
+        expected = cells.copy()
+        expected[4, 4] = True
+
+        assert_array_equal(board.to_cells(), expected)
+        assert_array_equal(board == 0, expected == 0)
+        self.assertEqual(board.to_cells().width, 5)
+
+
+class TestPaddedBoard(unittest.TestCase):
+    def test_interior(self):
+        """Reads, writes and numpy operations use the unpadded cells."""
+        cells = Cells(default_round1_board()[0])
+        board = PaddedBoard.from_cells(cells)
+
+        self.assertEqual(board.shape, cells.shape)
+        assert_array_equal(board, cells)
+        board[4, 4] = 1
+        self.assertEqual(board.padded[4 + board.padding, 4 + board.padding], 1)
+        self.assertEqual(np.sum(board != 0), np.sum(cells != 0) + 1)
+
+    def test_is_free(self):
+        """Positions outside the board are occupied by the border."""
+        cells = Cells(default_round1_board()[0])
+        board = PaddedBoard.from_cells(cells)
+        for x in range(-10, cells.width + 10):
+            for y in range(-10, cells.height + 10):
+                self.assertEqual(board.is_free([x, y]), cells.is_free([x, y]), f"{x}, {y}")
+
+    def test_copy(self):
+        """Copies are independent."""
+        board = PaddedBoard.from_cells(np.zeros((5, 5), dtype=np.int8))
+        copied = board.copy()
+        copied[2, 2] = 1
+
+        self.assertTrue(board.is_free([2, 2]))
+        self.assertFalse(copied.is_free([2, 2]))
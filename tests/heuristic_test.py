@@ -1,9 +1,11 @@
+import itertools
 import time
 import unittest
+from unittest.mock import patch
 from numpy.testing import assert_array_equal
 import heuristics
 import numpy as np
-from environments import spe_ed
+from environments import spe_ed, Spe_edSimulator
 
 
 def empty_board_1player():
@@ -75,6 +77,25 @@ def default_round1_board():
     return (cells, player, opponents, rounds, time.time() + 10)
 
 
+def expand_candidates(cells, player, rounds):
+    """Candidates of `score_candidates` after every action the player survives."""
+    children = Spe_edSimulator(cells, [player], rounds).expand()[0]
+    return [(child.cells, child.player, child.rounds) for child in children if child is not None]
+
+
+class RightwardHeuristic(heuristics.Heuristic):
+    """Scores players by their x coordinate and records the number of game states of every batch in `counts`."""
+    def __init__(self, counts=None):
+        self.counts = [] if counts is None else counts
+
+    def score(self, cells, player, opponents, rounds, deadline):
+        return player.x / cells.shape[1]
+
+    def score_batch(self, cells, players, opponents, rounds, deadline):
+        self.counts.append(len(players))
+        return super().score_batch(cells, players, opponents, rounds, deadline)
+
+
 def default_almost_full_board():
     """ board state visualised: board size = 5x5
     - # # # #
@@ -142,6 +163,33 @@ class TestRegionHeuristic(unittest.TestCase):
 
         assert_array_equal(board_state[0], default_round1_board()[0])
 
+    def test_score_batch(self):
+        """Batched scores equal the scores of each board."""
+        rng = np.random.default_rng(0)
+        cells, player, opponents, rounds, deadline = default_round1_board()
+        stacked = rng.random((10, ) + cells.shape) < 0.3
+        stacked[:, player.y, player.x] = True
+        for heuristic in [
+            heuristics.RegionHeuristic(),
+            heuristics.RegionHeuristic(closing_iterations=1),
+            heuristics.RegionHeuristic(opening_iterations=1, include_opponent_regions=False),
+        ]:
+            with self.subTest(msg=str(heuristic)):
+                scores = heuristic.score_batch(stacked, [player] * 10, opponents, np.full(10, rounds), deadline)
+                for n in range(10):
+                    self.assertAlmostEqual(scores[n], heuristic.score(stacked[n], player, opponents, rounds, deadline))
+
+    def test_score_candidates(self):
+        """Candidates are scored like single game states."""
+        cells, player, opponents, rounds, deadline = default_round1_board()
+        children = [child for child in Spe_edSimulator(cells, [player], rounds).expand()[0] if child is not None]
+        heuristic = heuristics.RegionHeuristic()
+        scores = heuristic.score_candidates(
+            [(child.cells, child.player, child.rounds) for child in children], opponents, deadline
+        )
+        for n, child in enumerate(children):
+            self.assertEqual(scores[n], heuristic.score(child.cells, child.player, opponents, child.rounds, deadline))
+
 
 class TestOpponentDistanceHeuristic(unittest.TestCase):
     def test_default_round1_board(self):
@@ -205,6 +253,77 @@ class TestRandomProbingHeuristic(unittest.TestCase):
 
         assert_array_equal(board_state[0], default_round1_board()[0])
 
+    def test_seed(self):
+        """Probes with the same seed give the same score."""
+        scores = [
+            heuristics.RandomProbingHeuristic(heuristics.RegionHeuristic(), n_steps=3, n_probes=5,
+                                              seed=0).score(*default_round1_board()) for _ in range(2)
+        ]
+        self.assertEqual(scores[0], scores[1])
+
+    def test_replay_random_numbers(self):
+        """Replayed random numbers give the same probes in every call."""
+        heuristic = heuristics.CompositeHeuristic(
+            [heuristics.RandomProbingHeuristic(heuristics.PathLengthHeuristic(6), n_steps=3, n_probes=2)]
+        )
+        heuristic.replay_random_numbers(True)
+        scores = [heuristic.score(*default_round1_board()) for _ in range(5)]
+        heuristic.replay_random_numbers(False)
+        self.assertEqual(len(set(scores)), 1)
+
+    def test_successive_halving(self):
+        """Successive halving spends at most the budget and most probe runs on the better candidates."""
+        counts = []
+        cells, player, opponents, rounds, deadline = empty_board_1player()
+        candidates = expand_candidates(cells, player, rounds)
+        heuristic = heuristics.RandomProbingHeuristic(
+            RightwardHeuristic(counts), n_steps=2, n_probes=8, seed=0, successive_halving=True
+        )
+        with patch.object(heuristic, "_probe", wraps=heuristic._probe) as probe:
+            scores = heuristic.score_candidates(candidates, opponents, deadline)
+
+        self.assertEqual(scores.shape, (len(candidates), ))
+        self.assertLessEqual(sum(counts), 8 * len(candidates))
+        self.assertEqual(counts[0] % len(candidates), 0)  # All candidates are probed in the first round
+
+        # Probe runs per candidate, `_probe` is called with the candidates and the number of probe runs of each
+        probed = [call.args[0] for call in probe.call_args_list]
+        runs = [
+            sum(call.args[2] for call in probe.call_args_list if any(c is candidate for c in call.args[0]))
+            for candidate in candidates
+        ]
+        self.assertLess(len(probed[-1]), len(probed[0]))  # Later rounds probe fewer candidates
+        self.assertGreater(scores.max(), scores.min())
+        self.assertGreater(runs[int(np.argmax(scores))], runs[int(np.argmin(scores))])
+
+    def test_successive_halving_single_round(self):
+        """With a single round, successive halving probes like scoring each candidate separately."""
+        cells, player, opponents, rounds, deadline = empty_board_1player()
+        candidates = expand_candidates(cells, player, rounds)[:2]  # ceil(log2(2)) = 1 round
+        scores = []
+        for successive_halving in [False, True]:
+            heuristic = heuristics.RandomProbingHeuristic(
+                RightwardHeuristic(), n_steps=3, n_probes=4, seed=0, successive_halving=successive_halving
+            )
+            heuristic.replay_random_numbers(True)  # Same random numbers for the probes of every candidate
+            scores.append(heuristic.score_candidates(candidates, opponents, deadline))
+        assert_array_equal(scores[0], scores[1])
+
+    def test_cells_heuristic(self):
+        """Final states of probes are evaluated as `Cells`."""
+        cells, player, opponents, rounds, deadline = empty_board_1player()
+        heuristic = heuristics.RandomProbingHeuristic(heuristics.WallhugHeuristic(), n_steps=2, n_probes=3, seed=0)
+        score = heuristic.score(spe_ed.Cells(cells), player, opponents, rounds, deadline)
+        self.assertGreaterEqual(score, 0)
+        self.assertLessEqual(score, 1)
+
+    def test_unbatched_heuristic(self):
+        """Heuristics without a batched implementation are evaluated for each probe."""
+        cells, player, opponents, rounds, deadline = empty_board_1player()
+        score = heuristics.RandomProbingHeuristic(heuristics.PathLengthHeuristic(3), n_steps=2,
+                                                  n_probes=10).score(cells, player, opponents, rounds, deadline)
+        self.assertGreater(score, 0)
+
 
 class TestPathLengthHeuristic(unittest.TestCase):
     def test_small_board(self):
@@ -272,6 +391,34 @@ class TestPathLengthHeuristic(unittest.TestCase):
 
         assert_array_equal(board_state[0], default_round1_board()[0])
 
+    def test_simulator_search(self):
+        """Same scores as an exhaustive search with the simulator, with and without transposition table."""
+        def longest_path(sim, depth, n_steps):
+            if depth >= n_steps:
+                return depth
+            lengths = [depth]
+            for action in spe_ed.actions:
+                sim.make([action])
+                if sim.player.active:
+                    lengths.append(longest_path(sim, depth + 1, n_steps))
+                sim.unmake()
+            return max(lengths)
+
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            height, width = rng.integers(3, 10, size=2)
+            cells = rng.random((height, width)) < 0.3
+            x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+            cells[y, x] = True
+            player = spe_ed.Player(1, x, y, spe_ed.directions[rng.integers(0, 4)], int(rng.integers(1, 4)), True)
+            n_steps, rounds = int(rng.integers(1, 8)), int(rng.integers(0, 12))
+
+            expected = longest_path(Spe_edSimulator(cells.copy(), [player.copy()], rounds), 0, n_steps) / n_steps
+            for table_size, bound_after in itertools.product((0, 2**16), (None, 0)):
+                heuristic = heuristics.PathLengthHeuristic(n_steps, table_size=table_size, bound_after=bound_after)
+                self.assertEqual(heuristic.score(cells, player, [], rounds, time.time() + 10), expected)
+                self.assertGreaterEqual(heuristic.upper_bound(cells, player, [], rounds), expected)
+
 
 class TestCompositeHeuristic(unittest.TestCase):
     def test_normalized_output_value(self):
@@ -300,6 +447,17 @@ class TestCompositeHeuristic(unittest.TestCase):
         self.assertGreaterEqual(score, 0.0)
         self.assertLessEqual(score, 1.0)
 
+    def test_upper_bound(self):
+        """Upper bounds are combined by weight."""
+        cells = np.ones((5, 5), dtype=bool)
+        cells[1:3, 1:3] = False
+        cells[1, 1] = True
+        player = spe_ed.Player(player_id=1, x=1, y=1, direction=spe_ed.directions[0], speed=1, active=True)
+        heuristic = heuristics.CompositeHeuristic(
+            heuristics=[heuristics.PathLengthHeuristic(n_steps=6), heuristics.RandomHeuristic()], weights=[3, 1]
+        )
+        self.assertEqual(heuristic.upper_bound(cells, player, [], 1), 3 / 4 * 3 / 6 + 1 / 4)
+
     def test_double_stacked_composites(self):
         """ Composite heuristic should be callable within other composite heuristic.
         Should return always a normalized result.
@@ -1,7 +1,10 @@
+import time
 import unittest
+import numpy as np
 from environments import SimulatedSpe_edEnv
+from environments.spe_ed import Player, directions_by_name
 import policies
-from heuristics import RandomHeuristic, CompositeHeuristic
+from heuristics import Heuristic, RandomHeuristic, CompositeHeuristic, RegionHeuristic, RandomProbingHeuristic
 
 
 def run_policy(env, pol):
@@ -109,6 +112,28 @@ class TestHeuristicPolicy(unittest.TestCase):
         )
         run_policy(env, pol)
 
+    def test_common_random_numbers(self):
+        """Executing the policy with random probes replayed for all actions should not throw any error."""
+        env = SimulatedSpe_edEnv(5, 5, [policies.RandomPolicy() for _ in range(5)])
+        pol = policies.HeuristicPolicy(
+            heuristic=RandomProbingHeuristic(RegionHeuristic(), n_steps=3, n_probes=5, seed=0),
+            common_random_numbers=True,
+        )
+        run_policy(env, pol)
+
+    def test_successive_halving(self):
+        """Executing the policy with probes allocated by successive halving should not throw any error."""
+        env = SimulatedSpe_edEnv(5, 5, [policies.RandomPolicy() for _ in range(5)])
+        pol = policies.HeuristicPolicy(
+            heuristic=CompositeHeuristic(
+                [
+                    RegionHeuristic(),
+                    RandomProbingHeuristic(RegionHeuristic(), n_steps=3, n_probes=5, successive_halving=True),
+                ]
+            )
+        )
+        run_policy(env, pol)
+
 
 class TestNamedPolicies(unittest.TestCase):
     def test_loading(self):
@@ -130,3 +155,39 @@ class TestNamedPolicies(unittest.TestCase):
 
         self.assertEqual(str(pol), "Adam")
         self.assertEqual(repr(pol)[:20], "HeuristicPolicy(heur")  # ...
+
+
+class TestActionSearchPolicy(unittest.TestCase):
+    def test_execution(self):
+        """Executing the policy should not throw any error."""
+        env = SimulatedSpe_edEnv(5, 5, [policies.RandomPolicy() for _ in range(5)])
+        pol = policies.ActionSearchPolicy(heuristic=RegionHeuristic(), occupancy_map_depth=2)
+        run_policy(env, pol)
+
+    def test_pruned_root_actions(self):
+        """The search continues, if all but one root action are pruned."""
+        class UpHeuristic(Heuristic):
+            """Prefers moving up, no state can be improved on."""
+            def score(self, cells, player, opponents, rounds, deadline):
+                scored.append(rounds)
+                return float(player.direction == directions_by_name["up"])
+
+            def upper_bound(self, cells, player, opponents, rounds):
+                return 0.0
+
+        scored = []
+        player = Player(1, 2, 2, directions_by_name["right"], 1, True)
+        cells = np.zeros((5, 5), dtype=bool)
+        cells[2, 2] = True
+        pol = policies.ActionSearchPolicy(heuristic=UpHeuristic(), depth_limit=3)
+
+        self.assertEqual(pol.act(cells, player, [], 1, time.time() + 10), "turn_left")
+        self.assertIn(3, scored)  # Successors of the root action were searched
+
+
+class TestMaximinSearchPolicy(unittest.TestCase):
+    def test_execution(self):
+        """Executing the policy should not throw any error."""
+        env = SimulatedSpe_edEnv(5, 5, [policies.RandomPolicy() for _ in range(5)])
+        pol = policies.Maximin_SearchPolicy(heuristic=RegionHeuristic(), depth_limit=3)
+        run_policy(env, pol)
@@ -1,11 +1,30 @@
+import itertools
+import json
+import pickle
+import tempfile
 import unittest
+from unittest.mock import patch
 import numpy as np
 from numpy.testing import assert_array_equal
-from environments import SimulatedSpe_edEnv, Spe_edSimulator
+from environments import SimulatedSpe_edEnv, Spe_edSimulator, Bitboard, BatchSimulator, OverlayBoard, PaddedBoard
+from environments import spe_ed, kernel, compact_log, archive
+from environments.serialization import pack_states, unpack_states
+from environments.compact_log import convert_logs
+from environments.logging import write_log
+from environments.moves import moves, direction_deltas, steps_inside, clip_move
 from environments.spe_ed import Player, directions, SavedGame
+from policies import RandomPolicy
 from pathlib import Path
 
 
+def unnamed(players):
+    """Copies of `players` without names, as logs contain names in their last states only."""
+    players = [p.copy() for p in players]
+    for p in players:
+        p.name = None
+    return players
+
+
 class TestSimulatorEnv(unittest.TestCase):
     def test_step_change_nothing(self):
         env = SimulatedSpe_edEnv(5, 5, [], seed=1)  # Seed places the player in the middle
@@ -122,6 +141,19 @@ class TestSimulatorEnv(unittest.TestCase):
                     del game.data[t]['deadline']  # Simulation doesn't have deadlines
                 self.assertDictEqual(env.game_state(), game.data[t])
 
+    def test_shared_observation(self):
+        """Observations share one read-only occupancy array, which is updated every step."""
+        env = SimulatedSpe_edEnv(20, 20, [RandomPolicy(seed=0)] * 3, seed=0)
+        cells, _, _, _, _ = env.reset()
+        done = False
+        while not done:
+            obs, _, done, _ = env.step("change_nothing")
+            self.assertIs(obs[0], cells)
+            assert_array_equal(cells, env.cells != 0)
+        self.assertFalse(cells.flags.writeable)
+        with self.assertRaises(ValueError):
+            cells[0, 0] = 1
+
 
 class TestSimulator(unittest.TestCase):
     def test_step_change_nothing(self):
@@ -206,6 +238,655 @@ class TestSimulator(unittest.TestCase):
                     # Compare cells
                     assert_array_equal(sim.cells, saved_game.cell_states[t + 1], f"t={t}")
                     # Compare players
-                    self.assertListEqual(sim.players, saved_game.player_states[t + 1], f"t={t}")
+                    self.assertListEqual(sim.players, unnamed(saved_game.player_states[t + 1]), f"t={t}")
                     # Compare rounds
                     self.assertEqual(sim.rounds, t + 2, f"t={t}")
+
+    def test_replay_bitboard(self):
+        for log_file in [
+            r"tests/logs/20201019-182018.json",  # Initial log
+            r"tests/logs/20201030-180428.json",  # Disconnect
+            r"tests/logs/20201101-141529.json",  # Jumping outside the map
+        ]:
+            with self.subTest(msg=Path(log_file).name):
+                # Initialize simulation on bitboard
+                saved_game = SavedGame.load(log_file)
+                sim = saved_game.create_simulator(0)
+                sim = Spe_edSimulator(Bitboard.from_cells(sim.cells), sim.players, sim.rounds)
+
+                for t in range(saved_game.rounds):
+                    actions = saved_game.infer_actions(t)
+                    sim = sim.step(actions)
+
+                    # Compare occupancy
+                    assert_array_equal(sim.cells, saved_game.cell_states[t + 1] != 0, f"t={t}")
+                    # Compare players
+                    self.assertListEqual(sim.players, unnamed(saved_game.player_states[t + 1]), f"t={t}")
+                    # Compare rounds
+                    self.assertEqual(sim.rounds, t + 2, f"t={t}")
+
+    def test_replay_overlay(self):
+        saved_game = SavedGame.load(r"tests/logs/20201101-141529.json")
+        root = saved_game.cell_states[0].copy()
+        sim = Spe_edSimulator(OverlayBoard(root), saved_game.player_states[0], 1)
+
+        for t in range(saved_game.rounds):
+            sim = sim.step(saved_game.infer_actions(t))
+
+            assert_array_equal(sim.cells, saved_game.cell_states[t + 1], f"t={t}")
+            self.assertListEqual(sim.players, unnamed(saved_game.player_states[t + 1]), f"t={t}")
+        assert_array_equal(root, saved_game.cell_states[0])  # Root is not modified
+        assert_array_equal(sim.cells.to_cells() != 0, saved_game.cell_states[-1] != 0)
+
+    def test_replay_padded(self):
+        for log_file in [
+            r"tests/logs/20201019-182018.json",  # Initial log
+            r"tests/logs/20201101-141529.json",  # Jumping outside the map
+        ]:
+            with self.subTest(msg=Path(log_file).name):
+                saved_game = SavedGame.load(log_file)
+                sim = saved_game.create_simulator(0)
+                sim = Spe_edSimulator(PaddedBoard.from_cells(sim.cells), sim.players, sim.rounds)
+
+                for t in range(saved_game.rounds):
+                    sim = sim.step(saved_game.infer_actions(t))
+
+                    assert_array_equal(sim.cells, saved_game.cell_states[t + 1], f"t={t}")
+                    self.assertListEqual(sim.players, unnamed(saved_game.player_states[t + 1]), f"t={t}")
+                    self.assertEqual(sim.rounds, t + 2, f"t={t}")
+
+    def test_bitboard_copy(self):
+        """Stepping on a bitboard must not modify the parent state."""
+        sim = Spe_edSimulator(Bitboard.from_cells(np.zeros((5, 5))), [Player(1, 2, 2, directions[0], 1, True)], 1)
+        sub_sim = sim.step(["speed_up"])
+
+        assert_array_equal(sim.cells, np.zeros((5, 5), dtype=bool))
+        self.assertTrue(sub_sim.cells[2, 3] and sub_sim.cells[2, 4])
+        self.assertTrue(sub_sim.cells.is_free([2, 2]))
+
+    def test_make_unmake(self):
+        for log_file in [
+            r"tests/logs/20201019-182018.json",  # Initial log
+            r"tests/logs/20201030-180428.json",  # Disconnect
+            r"tests/logs/20201101-141529.json",  # Jumping outside the map
+        ]:
+            for to_board in [np.copy, Bitboard.from_cells, OverlayBoard, PaddedBoard.from_cells]:
+                with self.subTest(msg=f"{Path(log_file).name}, {to_board.__name__}"):
+                    saved_game = SavedGame.load(log_file)
+                    initial_cells = to_board(saved_game.cell_states[0])
+                    sim = Spe_edSimulator(
+                        to_board(saved_game.cell_states[0]), [p.copy() for p in saved_game.player_states[0]], 1
+                    )
+
+                    # Perform complete game in place
+                    for t in range(saved_game.rounds):
+                        sim.make(saved_game.infer_actions(t))
+
+                        assert_array_equal(sim.cells != 0, saved_game.cell_states[t + 1] != 0, f"t={t}")
+                        self.assertListEqual(sim.players, unnamed(saved_game.player_states[t + 1]), f"t={t}")
+                        self.assertEqual(sim.rounds, t + 2, f"t={t}")
+
+                    # Revert all steps
+                    for t in reversed(range(saved_game.rounds)):
+                        sim.unmake()
+
+                        assert_array_equal(sim.cells, to_board(saved_game.cell_states[t]), f"t={t}")
+                        self.assertListEqual(sim.players, saved_game.player_states[t], f"t={t}")
+                        self.assertEqual(sim.rounds, t + 1, f"t={t}")
+                    assert_array_equal(sim.cells, initial_cells)
+                    self.assertEqual(len(sim.undo_log), 0)
+
+
+class TestBatchSimulator(unittest.TestCase):
+    def test_replay(self):
+        """Stacked states of a game are advanced like by `simulate`."""
+        for log_file in [
+            r"tests/logs/20201019-182018.json",  # Initial log
+            r"tests/logs/20201030-180428.json",  # Disconnect
+            r"tests/logs/20201101-141529.json",  # Jumping outside the map
+        ]:
+            with self.subTest(msg=Path(log_file).name):
+                saved_game = SavedGame.load(log_file)
+                batch = BatchSimulator.from_simulators(
+                    [saved_game.create_simulator(t) for t in range(saved_game.rounds)]
+                )
+                actions = [
+                    [spe_ed.actions.index(a) if a in spe_ed.actions else -1 for a in saved_game.infer_actions(t)]
+                    for t in range(saved_game.rounds)
+                ]
+
+                batch.step(actions)
+
+                for t in range(saved_game.rounds):
+                    sim = batch.to_simulator(t)
+                    assert_array_equal(sim.cells, saved_game.cell_states[t + 1], f"t={t}")
+                    self.assertListEqual(sim.players, unnamed(saved_game.player_states[t + 1]), f"t={t}")
+                    self.assertEqual(sim.rounds, t + 2, f"t={t}")
+
+    def test_random_games(self):
+        """Random games on small boards with many collisions are advanced like by `simulate`."""
+        rng = np.random.default_rng(0)
+        for n_players in [1, 2, 6]:
+            sims = []
+            for _ in range(20):
+                cells = np.zeros((8, 8), dtype=np.int8)
+                players = []
+                for player_id in range(1, n_players + 1):
+                    x, y = rng.integers(0, 8, size=2)
+                    cells[y, x] = player_id
+                    players.append(Player(player_id, x, y, rng.choice(directions), rng.integers(1, 11), True))
+                sims.append(Spe_edSimulator(cells, players, rng.integers(1, 7)))
+            batch = BatchSimulator.from_simulators(sims)
+
+            for t in range(10):
+                actions = rng.integers(0, 5, size=(len(sims), n_players))
+                mask = rng.random(len(sims)) < 0.8
+                batch.step(actions, mask)
+                for n, sim in enumerate(sims):
+                    if mask[n]:
+                        sims[n] = sim = sim.step([spe_ed.actions[a] for a in actions[n]])
+
+                    with self.subTest(msg=f"n_players={n_players}, t={t}, n={n}"):
+                        batched = batch.to_simulator(n)
+                        assert_array_equal(batched.cells, sim.cells)
+                        self.assertListEqual(batched.players, sim.players)
+                        self.assertEqual(batched.rounds, sim.rounds)
+
+    def test_vectorized(self):
+        """Vectorized steps without compiled kernel equal steps with kernel, if available."""
+        rng = np.random.default_rng(1)
+        sims = []
+        for _ in range(20):
+            cells = np.zeros((8, 8), dtype=np.int8)
+            players = []
+            for player_id in range(1, 7):
+                x, y = rng.integers(0, 8, size=2)
+                cells[y, x] = player_id
+                players.append(Player(player_id, x, y, rng.choice(directions), rng.integers(1, 11), True))
+            sims.append(Spe_edSimulator(cells, players, rng.integers(1, 7)))
+        batch = BatchSimulator.from_simulators(sims)
+        vectorized = batch.copy()
+
+        for t in range(10):
+            actions = rng.integers(0, 5, size=(len(sims), 6))
+            newly_occupied = batch.step(actions)
+            with patch("environments.batch_simulator.kernel_enabled", return_value=False):
+                assert_array_equal(vectorized.step(actions), newly_occupied, f"t={t}")
+            assert_array_equal(vectorized.cells, batch.cells, f"t={t}")
+            assert_array_equal(vectorized.active, batch.active, f"t={t}")
+            assert_array_equal(vectorized.x, batch.x, f"t={t}")
+            assert_array_equal(vectorized.rounds, batch.rounds, f"t={t}")
+
+    def test_legal_actions(self):
+        """Legal actions of the first player agree with `Spe_edSimulator.legal_actions` on crowded boards."""
+        rng = np.random.default_rng(2)
+        sims = []
+        for _ in range(100):
+            cells = rng.random((8, 8)) < 0.3
+            x, y = rng.integers(0, 8, size=2)
+            cells[y, x] = True
+            sims.append(
+                Spe_edSimulator(cells, [Player(1, x, y, rng.choice(directions), rng.integers(1, 11), True)],
+                                rng.integers(1, 7))
+            )
+        legal = BatchSimulator.from_simulators(sims).legal_actions()
+        for n, sim in enumerate(sims):
+            assert_array_equal(legal[n], sim.legal_actions(), f"n={n}")
+
+
+class TestKernel(unittest.TestCase):
+    def test_check(self):
+        """Kernel agrees with `simulate` on recorded games, as Python function and compiled."""
+        log_files = sorted(kernel.check_log_dir.glob("*.json"))
+        self.assertGreater(len(log_files), 0)
+        python_kernel = getattr(kernel.simulate_kernel, "py_func", kernel.simulate_kernel)
+        self.assertTrue(kernel.check_kernel(python_kernel, log_files))
+        self.assertTrue(kernel.check_kernel(kernel.simulate_kernel, log_files))
+
+    def test_enabled(self):
+        """Kernel is enabled if and only if numba is available."""
+        self.assertEqual(kernel.kernel_enabled(), kernel.njit is not None)
+
+
+class TestMoves(unittest.TestCase):
+    def test_jump(self):
+        """Jumps skip all but the first and the last cell."""
+        move = moves[0][5][True]
+        self.assertEqual(move.written, ((0, 1, 0), (4, 5, 0)))
+        self.assertEqual(move.skipped, ((1, 2, 0), (2, 3, 0), (3, 4, 0)))
+        self.assertEqual(move.end, (5, 0))
+        self.assertEqual(move.written_before, (0, 1, 1, 1, 1, 2))
+
+    def test_complete(self):
+        """Every step is either written or skipped."""
+        for d, (dx, dy) in enumerate(direction_deltas):
+            for speed in range(1, 11):
+                for jump in (False, True):
+                    move = moves[d][speed][jump]
+                    steps = sorted(move.written + move.skipped)
+                    self.assertListEqual(steps, [(i, (i + 1) * dx, (i + 1) * dy) for i in range(speed)])
+                    if not jump:
+                        self.assertEqual(len(move.skipped), 0)
+
+    def test_steps_inside(self):
+        self.assertEqual(steps_inside(0, 1, 2, 5, 4), 3)  # Right
+        self.assertEqual(steps_inside(1, 1, 2, 5, 4), 1)  # Down
+        self.assertEqual(steps_inside(2, 1, 2, 5, 4), 1)  # Left
+        self.assertEqual(steps_inside(3, 1, 2, 5, 4), 2)  # Up
+
+    def test_clip_move(self):
+        self.assertEqual(clip_move(0, 3, False, 1, 2, 5, 4), (moves[0][3][False].written, (3, 0), False))
+        # Leaving the bounds to the left after one step, the jumped over cells are not written
+        self.assertEqual(clip_move(2, 4, True, 1, 2, 5, 4), (((0, -1, 0), ), (-2, 0), True))
+
+
+class TestZobristHash(unittest.TestCase):
+    def test_incremental(self):
+        """Incrementally updated hashes equal hashes computed from scratch."""
+        for log_file in [
+            r"tests/logs/20201019-182018.json",  # Initial log
+            r"tests/logs/20201101-141529.json",  # Jumping outside the map
+        ]:
+            with self.subTest(msg=Path(log_file).name):
+                saved_game = SavedGame.load(log_file)
+                sim = saved_game.create_simulator(0)
+                in_place = Spe_edSimulator(sim.cells.copy(), [p.copy() for p in sim.players], sim.rounds)
+                hashes = [sim.zobrist_hash]
+                self.assertEqual(in_place.zobrist_hash, sim.zobrist_hash)
+
+                for t in range(saved_game.rounds):
+                    actions = saved_game.infer_actions(t)
+                    sim = sim.step(actions)
+                    in_place.make(actions)
+
+                    expected = saved_game.create_simulator(t + 1).zobrist_hash
+                    self.assertEqual(sim.zobrist_hash, expected, f"t={t}")
+                    self.assertEqual(in_place.zobrist_hash, expected, f"t={t}")
+                    hashes.append(expected)
+
+                self.assertEqual(len(set(hashes)), len(hashes))  # All states differ
+                for t in reversed(range(saved_game.rounds)):
+                    in_place.unmake()
+                    self.assertEqual(in_place.zobrist_hash, hashes[t], f"t={t}")
+
+    def test_transposition(self):
+        """Different action sequences leading to the same state have the same hash."""
+        sim = Spe_edSimulator(np.zeros((5, 10), dtype=bool), [Player(1, 0, 2, directions[0], 1, True)], 1)
+        sim.zobrist_hash  # Initialize hash
+
+        sim1 = sim.step(["change_nothing"]).step(["speed_up"]).step(["slow_down"])
+        sim2 = sim.step(["speed_up"]).step(["slow_down"]).step(["change_nothing"])
+        sim3 = sim.step(["speed_up"]).step(["change_nothing"]).step(["slow_down"])
+
+        self.assertEqual(sim1.zobrist_hash, sim2.zobrist_hash)
+        self.assertNotEqual(sim1.zobrist_hash, sim3.zobrist_hash)
+        self.assertEqual(sim1.zobrist_hash, Spe_edSimulator(sim1.cells, sim1.players, sim1.rounds).zobrist_hash)
+
+
+class TestExpand(unittest.TestCase):
+    def test_equals_step(self):
+        """Expanding all actions at once yields the same children as stepping each action."""
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            cells = (rng.random((8, 8)) < 0.3).astype(np.int8)
+            x, y = rng.integers(0, 8, size=2)
+            cells[y, x] = 1
+            player = Player(1, x, y, rng.choice(directions), rng.integers(1, 11), True)
+            for to_board in [np.copy, Bitboard.from_cells, PaddedBoard.from_cells]:
+                sim = Spe_edSimulator(to_board(cells), [player], rng.integers(1, 13))
+                sim.zobrist_hash  # Initialize hash
+
+                children, legal = sim.expand()
+                assert_array_equal(legal, sim.legal_actions())
+                for action, child, is_legal in zip(spe_ed.actions, children, legal):
+                    with self.subTest(msg=f"{player}, rounds={sim.rounds}, {action}"):
+                        expected = sim.step([action])
+                        self.assertEqual(is_legal, expected.player.active)
+                        if not is_legal:
+                            self.assertIsNone(child)
+                            continue
+                        assert_array_equal(child.cells, expected.cells)
+                        self.assertListEqual(child.players, expected.players)
+                        self.assertEqual(child.rounds, expected.rounds)
+                        self.assertSetEqual(set(child.changed), set(expected.changed))
+                        self.assertEqual(child.zobrist_hash, expected.zobrist_hash)
+
+
+class TestRollout(unittest.TestCase):
+    def test_equals_steps(self):
+        """Rollouts yield the same final state as stepping every round."""
+        rng = np.random.default_rng(0)
+        for n_players in [1, 2]:
+            for _ in range(100):
+                cells = (rng.random((12, 12)) < 0.1).astype(np.int8)
+                players = []
+                for player_id in range(1, n_players + 1):
+                    x, y = rng.integers(0, 12, size=2)
+                    cells[y, x] = player_id
+                    players.append(Player(player_id, x, y, rng.choice(directions), rng.integers(1, 4), True))
+                actions = [list(rng.choice(spe_ed.actions, size=n_players)) for _ in range(rng.integers(0, 20))]
+                for to_board in [np.copy, Bitboard.from_cells]:
+                    sim = Spe_edSimulator(to_board(cells), players, rng.integers(1, 13))
+                    sim.zobrist_hash  # Initialize hash
+
+                    with self.subTest(msg=f"{players}, rounds={sim.rounds}, {actions}"):
+                        result, death_round, newly_occupied = sim.rollout(actions)
+
+                        expected, expected_death_round, expected_newly_occupied = sim, None, set()
+                        for round_actions in actions:
+                            if not expected.player.active:
+                                break
+                            expected = expected.step(round_actions)
+                            expected_newly_occupied.update(expected.changed)
+                            if not expected.player.active:
+                                expected_death_round = expected.rounds - 1
+
+                        assert_array_equal(result.cells, expected.cells)
+                        self.assertListEqual(result.players, expected.players)
+                        self.assertEqual(result.rounds, expected.rounds)
+                        self.assertEqual(death_round, expected_death_round)
+                        self.assertSetEqual(set(newly_occupied), expected_newly_occupied)
+                        self.assertEqual(result.zobrist_hash, expected.zobrist_hash)
+
+    def test_single_actions(self):
+        """Actions of the first player may be passed without list."""
+        sim = Spe_edSimulator(np.zeros((5, 10), dtype=bool), [Player(1, 0, 2, directions[0], 1, True)], 1)
+
+        result, death_round, newly_occupied = sim.rollout(["speed_up", "change_nothing", "turn_left"])
+
+        self.assertEqual(result.player, Player(1, 4, 0, directions[3], 2, True))
+        self.assertEqual(result.rounds, 4)
+        self.assertIsNone(death_round)
+        self.assertListEqual(newly_occupied, [(1, 2), (2, 2), (3, 2), (4, 2), (4, 1), (4, 0)])
+
+        result, death_round, _ = result.rollout(["change_nothing", "change_nothing"])
+        self.assertFalse(result.player.active)
+        self.assertEqual(death_round, 4)
+        self.assertEqual(result.rounds, 5)
+
+
+class TestExpandJoint(unittest.TestCase):
+    def create_simulator(self):
+        cells = np.zeros((20, 20), dtype=np.int8)
+        players = [
+            Player(1, 5, 5, directions[0], 1, True),
+            Player(2, 8, 5, directions[2], 1, True),  # Close
+            Player(3, 7, 9, directions[3], 2, True),  # Reachable within two rounds
+            Player(4, 18, 18, directions[1], 1, True),  # Far away
+        ]
+        for p in players:
+            cells[p.y, p.x] = p.player_id
+        return Spe_edSimulator(cells, players, 1)
+
+    def test_interacting_opponents(self):
+        """Only opponents within reach are enumerated."""
+        sim = self.create_simulator()
+        self.assertListEqual(sim.interacting_opponents(1), [1])
+        self.assertListEqual(sim.interacting_opponents(2), [1, 2])
+
+        sim.players[1].active = False
+        self.assertListEqual(sim.interacting_opponents(2), [2])
+
+    def test_equals_step(self):
+        """Children equal stepping the joint actions and pruned opponents perform the default action."""
+        sim = self.create_simulator()
+        sim.zobrist_hash  # Initialize hash
+
+        for joint_actions, child in sim.expand_joint(horizon=2):
+            with self.subTest(msg=joint_actions):
+                self.assertEqual(joint_actions[3], "change_nothing")
+                expected = sim.step(joint_actions)
+                assert_array_equal(child.cells, expected.cells)
+                self.assertListEqual(child.players, expected.players)
+                self.assertEqual(child.rounds, expected.rounds)
+                self.assertSetEqual(set(child.changed), set(expected.changed))
+                self.assertEqual(child.zobrist_hash, expected.zobrist_hash)
+
+    def test_merge(self):
+        """All outcomes where the first player survives are enumerated, identical outcomes are merged."""
+        sim = self.create_simulator()
+
+        def outcome(state):
+            return np.asarray(state.cells).tobytes(), tuple((p.x, p.y, p.speed, p.active) for p in state.players)
+
+        children = [child for _, child in sim.expand_joint(horizon=2, radius=100)]
+        outcomes = {outcome(child) for child in children}
+        self.assertEqual(len(outcomes), len(children))
+        for a, b, c in itertools.product(spe_ed.actions, repeat=3):
+            expected = sim.step([a, b, c, "change_nothing"])
+            if expected.player.active:
+                self.assertIn(outcome(expected), outcomes, f"{a}, {b}, {c}")
+
+        # Actions of an opponent without cells near the first player are merged
+        children = list(sim.expand_joint(horizon=1, radius=0))
+        self.assertLess(len(children), len(spe_ed.actions)**2)
+
+
+class TestSerialization(unittest.TestCase):
+    def test_round_trip(self):
+        """States are restored from bytes, with occupancy instead of player ids."""
+        saved_game = SavedGame.load(r"tests/logs/20201101-141529.json")  # Jumping outside the map
+        for t in range(saved_game.rounds + 1):
+            sim = saved_game.create_simulator(t)
+            for bitboard in [False, True]:
+                with self.subTest(msg=f"t={t}, bitboard={bitboard}"):
+                    restored = Spe_edSimulator.from_bytes(sim.to_bytes(), bitboard)
+                    assert_array_equal(np.asarray(restored.cells), sim.cells != 0)
+                    self.assertListEqual(restored.players, unnamed(sim.players))
+                    self.assertEqual(restored.rounds, sim.rounds)
+                    self.assertEqual(restored.to_bytes(), sim.to_bytes())
+
+    def test_size(self):
+        """An 80x80 state with 6 players takes less than 1 KB."""
+        cells = np.ones((80, 80), dtype=np.int8)
+        players = [Player(i, 79, 0, directions[i % 4], 10, True) for i in range(1, 7)]
+        self.assertLess(len(Spe_edSimulator(cells, players, 1000).to_bytes()), 1024)
+
+    def test_batch(self):
+        """Many states are packed into one buffer."""
+        saved_game = SavedGame.load(r"tests/logs/20201019-182018.json")
+        sims = [saved_game.create_simulator(t) for t in range(saved_game.rounds)]
+
+        restored = unpack_states(pack_states(sims))
+
+        self.assertEqual(len(restored), len(sims))
+        for sim, r in zip(sims, restored):
+            self.assertEqual(r.to_bytes(), sim.to_bytes())
+        self.assertListEqual(unpack_states(pack_states([])), [])
+
+
+class TestPlayer(unittest.TestCase):
+    def test_direction(self):
+        """Directions may be given as `Direction` or index, turns update the index."""
+        player = Player(1, 2, 3, 1, 5, True)
+        self.assertEqual(player, Player(1, 2, 3, directions[1], 5, True))
+        self.assertIs(player.direction, directions[1])
+
+        player.perform("turn_left")
+        self.assertEqual(player.direction_index, 0)
+        player.perform("turn_left")
+        self.assertIs(player.direction, directions[3])
+        player.direction = directions[2]
+        player.perform("turn_right")
+        self.assertEqual(player.direction_index, 3)
+
+    def test_copy(self):
+        """Copies are independent and equal."""
+        player = Player(1, 2, 3, directions[1], 5, True, "name")
+        copy = player.copy()
+        self.assertEqual(copy, player)
+        self.assertEqual(copy.name, "name")
+        copy.perform("speed_up")
+        self.assertEqual(player.speed, 5)
+        self.assertNotEqual(copy, player)
+
+    def test_equality(self):
+        """Players with different names are not equal."""
+        self.assertNotEqual(Player(1, 2, 3, directions[1], 5, True, "a"), Player(1, 2, 3, directions[1], 5, True, "b"))
+        self.assertNotEqual(Player(1, 2, 3, directions[1], 5, True, "a"), Player(1, 2, 3, directions[1], 5, True))
+        self.assertIs(Player(1, 2, 3, directions[1], 5, True).__eq__(None), NotImplemented)
+
+    def test_json(self):
+        """Players are restored from JSON and pickle."""
+        player = Player(3, 2, 1, directions[0], 4, False, "name")
+        self.assertEqual(Player.from_json(*player.to_dict()), player)
+        self.assertEqual(pickle.loads(pickle.dumps(player)), player)
+
+
+class TestSavedGame(unittest.TestCase):
+    def test_lazy(self):
+        """States are parsed on access only and cached."""
+        game = SavedGame.load(Path(__file__).parent / "logs" / "20201019-182018.json")
+        self.assertEqual(game.rounds, len(game.data) - 1)
+        self.assertIn(game.winner, game.player_states[len(game.data) - 1])
+        self.assertEqual((game.height, game.width), np.array(game.data[0]['cells']).shape)
+        self.assertEqual(len(list(game.cell_states.parsed())), 0)
+
+        self.assertIs(game.cell_states[3], game.cell_states[3])
+        assert_array_equal(game.cell_states[-1], np.array(game.data[-1]['cells']))
+        self.assertEqual(len(game.cell_states[1:4]), 3)
+        self.assertEqual(len(list(game.cell_states.parsed())), 4)
+
+    def test_move_controlled_player_to_front(self):
+        """Swapping applies to states parsed before and after."""
+        data = json.loads((Path(__file__).parent / "logs" / "20201019-182018.json").read_text())
+        for state in data:
+            state["you"] = 2
+        game = SavedGame(data)
+        before = game.cell_states[5].copy(), list(game.player_states[5])
+        game.move_controlled_player_to_front()
+
+        for t in (5, 10):
+            cells = np.array(data[t]['cells'])
+            expected = np.where(cells == 1, 2, np.where(cells == 2, 1, cells))
+            assert_array_equal(game.cell_states[t], expected)
+            players = game.player_states[t]
+            self.assertEqual((players[0].player_id, players[1].player_id), (2, 1))
+        self.assertEqual(game.player_states[5][0], before[1][1])
+
+        game.move_controlled_player_to_front()
+        assert_array_equal(game.cell_states[5], before[0])
+        assert_array_equal(game.cell_states[20], np.array(data[20]['cells']))
+
+    def test_missing_you(self):
+        """Logs without the controlled player can be loaded."""
+        data = json.loads((Path(__file__).parent / "logs" / "20201019-182018.json").read_text())
+        for state in data:
+            state.pop("you", None)
+        game = SavedGame(data)
+        self.assertIsNone(game.you)
+        assert_array_equal(game.cell_states[5], np.array(data[5]['cells']))
+        with self.assertRaises(ValueError):
+            game.move_controlled_player_to_front()
+
+    def test_compact(self):
+        """Compact logs restore all states of JSON logs."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertListEqual(convert_logs(Path(__file__).parent / "logs", tmp_dir), [])
+
+            for log_file in (Path(__file__).parent / "logs").glob("*.json"):
+                with self.subTest(log_file=log_file.name):
+                    game = SavedGame.load(log_file)
+                    compact = SavedGame.load(Path(tmp_dir) / (log_file.name[:-5] + compact_log.suffix))
+                    self.assertLess(
+                        (Path(tmp_dir) / (log_file.name[:-5] + compact_log.suffix)).stat().st_size,
+                        log_file.stat().st_size
+                    )
+                    self.assertEqual((compact.width, compact.height, compact.you), (game.width, game.height, game.you))
+                    self.assertEqual(compact.rounds, game.rounds)
+                    self.assertEqual(compact.winner, game.winner)
+                    self.assertListEqual(compact.names, game.names)
+                    for t in range(len(game.cell_states)):
+                        assert_array_equal(compact.cell_states[t], game.cell_states[t])
+                        self.assertListEqual(compact.player_states[t], game.player_states[t])
+
+    def test_compressed(self):
+        """Compressed logs are smaller and load like plain logs."""
+        log_file = Path(__file__).parent / "logs" / "20201019-182018.json"
+        states = json.loads(log_file.read_text())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            compressed_file = write_log(tmp_dir, "game", states)
+            self.assertEqual(compressed_file.name, "game" + spe_ed.compressed_suffix)
+            self.assertLess(compressed_file.stat().st_size, log_file.stat().st_size / 10)
+            self.assertEqual(write_log(tmp_dir, "game", states, compression_level=None).name, "game.json")
+
+            game = SavedGame.load(log_file)
+            compressed = SavedGame.load(compressed_file)
+            self.assertEqual(compressed.rounds, game.rounds)
+            for t in range(len(game.cell_states)):
+                assert_array_equal(compressed.cell_states[t], game.cell_states[t])
+                self.assertListEqual(compressed.player_states[t], game.player_states[t])
+
+            # Compressed logs are converted as well
+            (Path(tmp_dir) / "game.json").unlink()
+            self.assertListEqual(convert_logs(tmp_dir), [])
+            compact = SavedGame.load(Path(tmp_dir) / ("game" + compact_log.suffix))
+            assert_array_equal(compact.cell_states[-1], game.cell_states[-1])
+
+    def test_archive(self):
+        """Games are restored from archives and indexed."""
+        log_files = sorted((Path(__file__).parent / "logs").glob("*.json"))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            archive_file = Path(tmp_dir) / ("logs" + archive.suffix)
+            self.assertListEqual(archive.write_archive(archive_file, log_files), [])
+            self.assertTrue(archive.is_archive(archive_file))
+
+            game_archive = archive.GameArchive(archive_file)
+            self.assertListEqual(game_archive.names, [log_file.name[:-5] for log_file in log_files])
+            for log_file, entry in zip(log_files, game_archive.index):
+                with self.subTest(log_file=log_file.name):
+                    game = SavedGame.load(log_file)
+                    archived = game_archive.load(entry["name"])
+                    self.assertEqual(
+                        (entry["width"], entry["height"], entry["rounds"], entry["names"], entry["you"]),
+                        (game.width, game.height, game.rounds, game.names, game.you),
+                    )
+                    self.assertEqual(entry["winner"], game.winner.player_id if game.winner is not None else None)
+                    self.assertEqual(entry["date"][:4], "2020")
+                    for t in (0, game.rounds // 2, game.rounds):
+                        assert_array_equal(archived.cell_states[t], game.cell_states[t])
+                        self.assertListEqual(archived.player_states[t], game.player_states[t])
+            del game_archive, archived  # Close memory map
+
+    def test_archive_corrupt_logs(self):
+        """Corrupt, truncated and malformed logs are skipped."""
+        log_file = Path(__file__).parent / "logs" / "20201019-182018.json"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            compressed = write_log(tmp_dir, "compressed", json.loads(log_file.read_text()))
+            corrupt = [
+                tmp_dir / ("corrupt" + spe_ed.compressed_suffix),
+                tmp_dir / ("truncated" + spe_ed.compressed_suffix),
+            ]
+            corrupt[0].write_bytes(b"not gzip")
+            corrupt[1].write_bytes(compressed.read_bytes()[:100])
+            corrupt.append(tmp_dir / "malformed.json")
+            corrupt[2].write_text(json.dumps([{"cells": [], "players": {}}]))
+            corrupt.append(tmp_dir / ("corrupt" + compact_log.suffix))
+            corrupt[3].write_bytes(b"SPED")
+
+            failed = archive.write_archive(tmp_dir / ("logs" + archive.suffix), [log_file, *corrupt])
+            self.assertListEqual(failed, corrupt)
+            game_archive = archive.GameArchive(tmp_dir / ("logs" + archive.suffix))
+            self.assertListEqual(game_archive.names, [log_file.name[:-5]])
+            del game_archive  # Close memory map
+
+    def test_compact_collisions(self):
+        """Collisions are restored in the round they occur."""
+        states = [
+            {
+                'cells': cells,
+                'players': {'1': dict(x=0, y=0, direction='right', speed=1, active=active)},
+                'you': 1,
+                'running': active,
+            } for cells, active in (([[1, 0], [0, 0]], True), ([[1, 1], [0, 0]], True), ([[1, -1], [0, 0]], False))
+        ]
+        game = compact_log.CompactGame.from_states(states)
+        game = compact_log.CompactGame.from_bytes(game.to_bytes())
+        for t, state in enumerate(states):
+            assert_array_equal(game.cells(t), state['cells'])
+        self.assertFalse(game.players(2)[0].active)
+
+        states[2]['cells'][0][0] = 0  # Cells never become free again
+        with self.assertRaises(ValueError):
+            compact_log.CompactGame.from_states(states)
@@ -2,7 +2,8 @@ import unittest
 import numpy as np
 from numpy.testing import assert_array_equal, assert_array_almost_equal
 from environments.spe_ed import Player, directions_by_name, SavedGame
-from state_representation import occupancy_map, padded_window
+from environments import spe_ed, Spe_edSimulator
+from state_representation import occupancy_map, padded_window, reachable_states, reachability_map, reachable_region_size
 
 
 class TestOccupancyMap(unittest.TestCase):
@@ -130,3 +131,87 @@ class TestPaddedWindow(unittest.TestCase):
                 [-1, -1, -1, -1, -1],
             ]
         )
+
+
+class TestReachability(unittest.TestCase):
+    def brute_force(self, cells, player, rounds, depth):
+        """Explore the tree of all action sequences."""
+        states = [set() for _ in range(depth)]
+        occupied = [set() for _ in range(depth)]
+
+        def _recursion(sim, level):
+            for action in spe_ed.actions:
+                sim.make([action])
+                if sim.player.active:
+                    p = sim.player
+                    states[level].add((p.x, p.y, p.direction_index, p.speed))
+                    occupied[level].update(sim.changed)
+                    if level + 1 < depth:
+                        _recursion(sim, level + 1)
+                sim.unmake()
+
+        _recursion(Spe_edSimulator(cells.copy(), [player.copy()], rounds), 0)
+        return states, occupied
+
+    def test_exact(self):
+        """Exact reachability equals exploring all action sequences, including jumps."""
+        game = SavedGame.load(r"tests/logs/20201019-182018.json")
+        for t in [0, 4, 30]:
+            for player in game.player_states[t]:
+                with self.subTest(msg=f"t={t}, {player}"):
+                    states, occupied = reachable_states(game.cell_states[t], player, t + 1, depth=4)
+                    expected_states, expected_occupied = self.brute_force(
+                        game.cell_states[t], player, t + 1, depth=4
+                    )
+                    self.assertListEqual(states, expected_states)
+                    self.assertListEqual(occupied, expected_occupied)
+
+    def test_approximate(self):
+        """Ignoring the trail yields a superset of the exact states."""
+        cells = np.zeros((20, 20), dtype=np.int8)
+        player = Player(1, 10, 10, directions_by_name["right"], 1, True)
+        exact, _ = reachable_states(cells, player, 1, depth=6)
+        approximate, _ = reachable_states(cells, player, 1, depth=6, exact=False)
+        for e, a in zip(exact, approximate):
+            self.assertTrue(e <= a)
+
+    def test_reachability_map(self):
+        """Cells are marked with the earliest round they may be occupied."""
+        cells = np.zeros((5, 5), dtype=np.int32)
+        cells[2, 2] = 1
+
+        reach = reachability_map(cells, [Player(1, 2, 2, directions_by_name["right"], 1, True)], rounds=1, depth=2)
+
+        assert_array_equal(
+            reach, [
+                [0, 0, 2, 0, 2],
+                [0, 2, 1, 2, 2],
+                [0, 0, 0, 1, 1],
+                [0, 2, 1, 2, 2],
+                [0, 0, 2, 0, 2],
+            ]
+        )
+
+    def test_region_size(self):
+        """Regions are merged where the player can jump over walls."""
+        cells = np.zeros((1, 12), dtype=np.int8)
+        cells[0, 0] = 1
+        cells[0, 2:4] = 1
+        self.assertEqual(reachable_region_size(cells, 0, 0), 9)  # Jump from 0 over 2 and 3
+
+        cells[0, 2:11] = 1
+        self.assertEqual(reachable_region_size(cells, 0, 0), 1)  # Wall too thick
+
+        cells = np.ones((5, 5), dtype=np.int8)
+        cells[1:4, 1:4] = 0
+        self.assertEqual(reachable_region_size(cells, 2, 2), 9)
+
+    def test_region_size_bound(self):
+        """Region size bounds the number of cells a player occupies."""
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            cells = (rng.random((12, 12)) < 0.5).astype(np.int8)
+            player = Player(1, 6, 6, directions_by_name["right"], 1, True)
+            cells[6, 6] = 1
+            _, occupied = reachable_states(cells, player, 1, depth=8, exact=False)
+            self.assertGreaterEqual(reachable_region_size(cells, 6, 6), len(set().union(*occupied)))
@@ -0,0 +1,175 @@
+"""This tool script benchmarks the throughput of the simulator.
+
+Results are written as JSON and can be compared to a previous run:
+
+    python tool_benchmark.py --output bench.json
+    python tool_benchmark.py --baseline bench.json
+"""
+import argparse
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+from environments import spe_ed
+from environments.simulator import Spe_edSimulator, simulate
+from environments.spe_ed import Player, SavedGame, directions
+
+board_sizes = (41, 60, 80)
+player_counts = (2, 6)
+speeds = (1, 5, 10)
+fill_levels = (0.0, 0.5, 0.9)
+log_dir = Path(__file__).parent / "tests" / "logs"
+
+
+def create_state(rng, size, n_players, speed, fill):
+    """Create random board of `size`x`size` with a fraction `fill` of occupied cells."""
+    cells = np.where(rng.random((size, size)) < fill, rng.integers(1, n_players + 1, size=(size, size)), 0)
+    cells = cells.astype(np.int8)
+    players = []
+    for player_id in range(1, n_players + 1):
+        x, y = rng.integers(0, size, size=2)
+        cells[y, x] = player_id
+        players.append(Player(player_id, int(x), int(y), directions[rng.integers(0, 4)], speed, True))
+    return cells, players
+
+
+def measure(run, create_input, min_time):
+    """Measure operations per second and peak memory per operation.
+
+    Args:
+        run: Function performing one operation on an input
+        create_input: Function creating a fresh input for one operation, which is not measured
+        min_time: Minimum total runtime in seconds
+    """
+    # Peak memory of single operations, inputs are allocated before tracing
+    inputs = [create_input() for _ in range(5)]
+    peaks = []
+    for i in inputs:
+        tracemalloc.start()
+        run(i)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    # Throughput in batches of increasing size
+    n_ops, total_time, batch_size = 0, 0.0, 10
+    while total_time < min_time:
+        inputs = [create_input() for _ in range(batch_size)]
+        start = time.perf_counter()
+        for i in inputs:
+            run(i)
+        total_time += time.perf_counter() - start
+        n_ops += batch_size
+        batch_size *= 2
+
+    return {
+        "steps_per_sec": n_ops / total_time,
+        "peak_bytes_per_step": int(np.median(peaks)),
+    }
+
+
+def scenarios(rng):
+    """Yield `(benchmark, params, run, create_input)` for all benchmarks."""
+    for size, n_players, speed, jump, fill in itertools.product(
+        board_sizes, player_counts, speeds, (False, True), fill_levels
+    ):
+        cells, players = create_state(rng, size, n_players, speed, fill)
+        rounds = 6 if jump else 1
+
+        def create_input(cells=cells, players=players):
+            actions = [spe_ed.actions[a] for a in rng.integers(0, len(spe_ed.actions), size=len(players))]
+            return cells.copy(), [p.copy() for p in players], actions
+
+        yield (
+            "simulate",
+            dict(size=size, players=n_players, speed=speed, jump=jump, fill=fill),
+            lambda i, rounds=rounds: simulate(i[0], i[1], rounds, i[2]),
+            create_input,
+        )
+
+    for size, n_players, fill in itertools.product(board_sizes, player_counts, fill_levels):
+        cells, players = create_state(rng, size, n_players, 1, fill)
+        sim = Spe_edSimulator(cells, players, 1)
+
+        def create_input(sim=sim):
+            return [spe_ed.actions[a] for a in rng.integers(0, len(spe_ed.actions), size=len(sim.players))]
+
+        params = dict(size=size, players=n_players, fill=fill)
+        yield "step_undo", params, lambda actions, sim=sim: sim.step(actions).undo(), create_input
+
+        def make_unmake(actions, sim=sim):
+            sim.make(actions)
+            sim.unmake()
+
+        yield "make_unmake", params, make_unmake, create_input
+
+    for size, fill in itertools.product(board_sizes, fill_levels):
+        cells, players = create_state(rng, size, 1, 1, fill)
+        sim = Spe_edSimulator(cells, players, 1)
+
+        def create_input():
+            return [spe_ed.actions[a] for a in rng.choice([0, 1, 4], size=20, p=[0.1, 0.1, 0.8])]
+
+        params = dict(size=size, fill=fill, steps=20)
+        yield "rollout", params, lambda actions, sim=sim: sim.rollout(actions), create_input
+
+    _, players = create_state(rng, 41, 1, 1, 0.0)
+    yield "player_copy", {}, lambda player: player.copy(), lambda: players[0]
+
+    for log_file in sorted(log_dir.glob("*.json")):
+        yield "savedgame_load", dict(log=log_file.name), SavedGame.load, lambda log_file=log_file: log_file
+
+
+def result_key(result):
+    """Identify a result by its benchmark and parameters, to match it with the same result of another run."""
+    return result["benchmark"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results, baseline, threshold):
+    """Print relative throughput of `results` compared to `baseline` results."""
+    baseline = {result_key(r): r for r in baseline["results"]}
+    print(f"{'benchmark':70} {'steps/s':>12} {'baseline':>12} {'ratio':>7}")
+    for result in results:
+        key = result_key(result)
+        if key not in baseline:
+            continue
+        ratio = result["steps_per_sec"] / baseline[key]["steps_per_sec"]
+        flag = " slower" if ratio < 1 - threshold else " faster" if ratio > 1 + threshold else ""
+        print(f"{key:70} {result['steps_per_sec']:12.0f} {baseline[key]['steps_per_sec']:12.0f} {ratio:7.2f}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Simulator benchmark')
+    parser.add_argument('--output', type=str, default=None, help='JSON file to write results to.')
+    parser.add_argument('--baseline', type=str, default=None, help='JSON file of a previous run to compare to.')
+    parser.add_argument('--filter', type=str, default=None, help='Only run benchmarks containing this string.')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum runtime per scenario in seconds.')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change reported as slower or faster.')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    for benchmark, params, run, create_input in scenarios(rng):
+        if args.filter is not None and args.filter not in benchmark:
+            continue
+        result = dict(benchmark=benchmark, params=params, **measure(run, create_input, args.min_time))
+        print(f"{result_key(result):70} {result['steps_per_sec']:12.0f} steps/s")
+        results.append(result)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "results": results,
+                },
+                f,
+                indent=4,
+            )
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            compare(results, json.load(f), args.threshold)
@@ -0,0 +1,28 @@
+"""This tool script converts plain or compressed JSON log files to the compact log format of `environments.compact_log`.
+
+    python tool_convert_logs.py logs/ --out-dir compact_logs/
+
+Alternatively, all logs of a directory are packed into one game archive, see `environments.archive`:
+
+    python tool_convert_logs.py logs/ --archive logs.spe_ed_archive
+"""
+import argparse
+import logging
+from environments.archive import write_archive
+from environments.compact_log import convert_logs
+from statistics import get_log_files
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert JSON logs to compact logs')
+    parser.add_argument('log_dir', type=str, help='Directory containing JSON logs.')
+    parser.add_argument('--out-dir', type=str, default=None, help='Directory for compact logs, defaults to log_dir.')
+    parser.add_argument('--delete', action='store_true', help='Delete JSON logs after successful conversion.')
+    parser.add_argument('--archive', type=str, default=None, help='Pack all logs into this game archive instead.')
+    args = parser.parse_args()
+
+    if args.archive is not None:
+        failed = write_archive(args.archive, sorted(get_log_files(args.log_dir)))
+    else:
+        failed = convert_logs(args.log_dir, args.out_dir, args.delete)
+    for log_file in failed:
+        logging.warning(f"Failed to convert {log_file}")
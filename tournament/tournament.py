@@ -5,9 +5,9 @@ import numpy as np
 from tqdm.auto import tqdm
 from pathlib import Path
 from uuid import uuid4
-import json
 import multiprocessing as mp
 import pandas as pd
+from environments.logging import write_log
 from environments.spe_ed import SavedGame
 from environments.simulator import simulate, SimulatedSpe_edEnv
 from importlib.machinery import SourceFileLoader
@@ -20,11 +20,13 @@ def init_stats_lock(l):
 
 
 class TournamentLogger():
-    def __init__(self, log_dir, write_logs):
+    def __init__(self, log_dir, write_logs, compact_logs=False, compression_level=6):
         self.log_dir = Path(log_dir)
         self.csv_file = self.log_dir.parent / "statistics.csv"
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.write_logs = write_logs
+        self.compact_logs = compact_logs
+        self.compression_level = compression_level
 
     def log(self, states, execution_times):
         """Handle the logging of a completed tournament game with a set of different policies.
@@ -33,19 +35,18 @@ class TournamentLogger():
             states: List of game states in form of parsed json.
             policy_ids: The used policy IDs
         """
-        log_file = self.log_dir / f"{uuid4().hex}.json"
+        name = uuid4().hex
 
         # Write log files
         if self.write_logs:
-            with open(log_file, "w") as f:
-                json.dump(states, f, separators=(',', ':'))
+            write_log(self.log_dir, name, states, self.compact_logs, self.compression_level)
 
         # Append new statisics
         game = SavedGame(states)
         df_stats = pd.DataFrame(
             [
                 (
-                    log_file.name[:-5],  # name of game
+                    name,  # name of game
                     game.rounds,  # rounds
                     game.winner.name if game.winner is not None else None,  # winner
                     game.names[game.you - 1] if game.you is not None else None,  # you
@@ -94,7 +95,8 @@ class TournamentEnv(SimulatedSpe_edEnv):
                 actions.append("change_nothing")
 
         # Perform simulation step
-        _, _, self.rounds, _ = simulate(self.cells, self.players, self.rounds, actions)
+        _, _, self.rounds, newly_occupied = simulate(self.cells, self.players, self.rounds, actions)
+        self._update_occupancy(newly_occupied)
         self.deadline = time.time() + self.time_limit
 
         done = sum(1 for p in self.players if p.active) < 2
@@ -157,7 +159,12 @@ def run_tournament(show, log_dir, tournament_config_file, cores=None):
     if log_dir is not None:
         directory = Path(log_dir)
         directory.mkdir(parents=True, exist_ok=True)
-        logger = TournamentLogger(log_dir, config.write_logs)
+        logger = TournamentLogger(
+            log_dir,
+            config.write_logs,
+            getattr(config, "compact_logs", False),
+            getattr(config, "compression_level", 6),
+        )
     else:
         logger = None
 
@@ -15,3 +15,5 @@ n_players_distribution = [0.14, 0.2, 0.22, 0.22, 0.22]  # Estimated server distr
 n_games = 500
 
 write_logs = False
+compact_logs = False  # Write logs in compact binary format instead of JSON
+compression_level = 6  # gzip level of JSON logs, None writes uncompressed JSON